@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Compare --enhance-stereo as two encodes (convert, then re-encode) against the single-pass graph
+
+    python bench_enhance.py --minutes 60 --repeat 3
+"""
+
+import argparse
+import resource
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from youtube_to_mp3_with_lyrics import AudioProcessor
+
+def make_input(path: Path, minutes: float):
+    """Encode a stereo AAC test tone, like a downloaded YouTube audio stream"""
+    AudioProcessor.run_cmd(["ffmpeg", "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={minutes * 60:g}",
+                            "-ac", "2", "-c:a", "aac", "-b:a", "128k", "-y", str(path)])
+
+def two_pass(input_path: str, output_path: str, start_time: str, end_time: str):
+    """The previous pipeline: trim and encode, then decode that MP3 and encode it again"""
+    AudioProcessor.run_cmd(["ffmpeg", "-i", input_path, "-vn", *AudioProcessor.ENCODE_ARGS,
+                            *(["-ss", start_time] if start_time else []),
+                            *(["-to", end_time] if end_time else []), "-y", output_path])
+    AudioProcessor.enhance_stereo(output_path)
+
+def single_pass(input_path: str, output_path: str, start_time: str, end_time: str):
+    AudioProcessor.convert_to_mp3(input_path, output_path, True, start_time, end_time)
+
+def measure(func: Callable[[], None]) -> Tuple[float, float]:
+    """Run func once; returns (wall seconds, CPU seconds of the child processes it waited for)"""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    func()
+    wall = time.perf_counter() - started
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return wall, (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stereo enhancement encodes")
+    parser.add_argument("--input", help="Audio file to convert (default: a generated test tone)")
+    parser.add_argument("--minutes", type=float, default=60, help="Length of the generated input (default: 60)")
+    parser.add_argument("-s", "--start", help="Start time (MM:SS or HH:MM:SS)")
+    parser.add_argument("-e", "--end", help="End time (MM:SS or HH:MM:SS)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant (default: 3)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        input_path = args.input
+        if not input_path:
+            input_path = str(temp_dir / "input.m4a")
+            print(f"🎵 Generating a {args.minutes:g}-minute input...")
+            make_input(Path(input_path), args.minutes)
+        output_path = str(temp_dir / "output.mp3")
+        
+        variants: Dict[str, Callable[[str, str, str, str], None]] = {"two-pass": two_pass,
+                                                                    "single-pass": single_pass}
+        results: Dict[str, List[Tuple[float, float]]] = {name: [] for name in variants}
+        for _ in range(args.repeat):
+            # Interleave the variants so drift in machine load affects both alike
+            for name, func in variants.items():
+                results[name].append(measure(lambda: func(input_path, output_path, args.start, args.end)))
+        
+        print(f"\n{'variant':<14}{'wall':>10}{'cpu':>10}")
+        medians = {}
+        for name, runs in results.items():
+            medians[name] = (statistics.median(w for w, _ in runs), statistics.median(c for _, c in runs))
+            print(f"{name:<14}{medians[name][0]:>9.1f}s{medians[name][1]:>9.1f}s")
+        (old_wall, old_cpu), (new_wall, new_cpu) = medians["two-pass"], medians["single-pass"]
+        if new_wall and new_cpu:
+            print(f"📊 Single pass: {old_wall / new_wall:.2f}x faster, {old_cpu / new_cpu:.2f}x less CPU")
+
+if __name__ == "__main__":
+    main()
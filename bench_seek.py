@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Compare convert_to_mp3 seek strategies for an excerpt at increasing start offsets
+
+    python bench_seek.py --minutes 180 --offsets 0:30,30:00,90:00,175:00 --length 300
+"""
+
+import argparse
+import statistics
+import tempfile
+from pathlib import Path
+
+from bench_enhance import make_input, measure
+from youtube_to_mp3_with_lyrics import AudioProcessor, SubtitleProcessor
+
+def clock(seconds: float) -> str:
+    return f"{int(seconds // 3600)}:{int(seconds % 3600 // 60):02d}:{seconds % 60:06.3f}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ffmpeg seek strategies")
+    parser.add_argument("--input", help="Audio file to cut (default: a generated test tone)")
+    parser.add_argument("--minutes", type=float, default=180, help="Length of the generated input (default: 180)")
+    parser.add_argument("--offsets", default="0:30,30:00,90:00,175:00",
+                        help="Comma-separated excerpt start times (default: 0:30,30:00,90:00,175:00)")
+    parser.add_argument("--length", type=float, default=300, help="Excerpt length in seconds (default: 300)")
+    parser.add_argument("--strategies", default=",".join(s for s in AudioProcessor.SEEK_STRATEGIES if s != "auto"),
+                        help="Comma-separated strategies to compare")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per strategy and offset (default: 3)")
+    args = parser.parse_args()
+    
+    strategies = args.strategies.split(',')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        input_path = args.input
+        if not input_path:
+            input_path = str(temp_dir / "input.m4a")
+            print(f"🎵 Generating a {args.minutes:g}-minute input...")
+            make_input(Path(input_path), args.minutes)
+        output_path = str(temp_dir / "output.mp3")
+        
+        rows = []
+        for offset in args.offsets.split(','):
+            start = SubtitleProcessor.parse_time(offset)
+            start_time, end_time = clock(start), clock(start + args.length)
+            for strategy in strategies:
+                runs = [measure(lambda: AudioProcessor.convert_to_mp3(input_path, output_path, False, start_time,
+                                                                       end_time, strategy))
+                        for _ in range(args.repeat)]
+                rows.append((offset, strategy, statistics.median(w for w, _ in runs),
+                             statistics.median(c for _, c in runs)))
+        
+        print(f"\n{'offset':>10}  {'strategy':<10}{'wall':>10}{'cpu':>10}")
+        for offset, strategy, wall, cpu in rows:
+            print(f"{offset:>10}  {strategy:<10}{wall:>9.2f}s{cpu:>9.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Compare SRT to LRC conversion memory: streamed cues against reading the whole file
+
+    python bench_srt_memory.py --cues 200000
+"""
+
+import argparse
+import json
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from youtube_to_mp3_with_lyrics import SubtitleProcessor
+
+def srt_time(ms: int) -> str:
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+def make_srt(path: Path, cues: int, crlf: bool):
+    """Write a livestream-like SRT: two-second cues, some with markup and two lines"""
+    newline = '\r\n' if crlf else '\n'
+    with open(path, 'w', encoding='utf-8', newline=newline) as f:
+        f.write('\ufeff')
+        for i in range(cues):
+            start, end = i * 2000, i * 2000 + 1900
+            text = f"<i>caption {i}</i>\nsecond line" if i % 10 == 0 else f"caption {i} of the stream"
+            f.write(f"{i + 1}\n{srt_time(start)} --> {srt_time(end)}\n{text}\n\n")
+
+def legacy_srt_to_lrc(srt_path: str, lrc_path: str):
+    """The previous converter: whole file in memory, split into blocks, sorted(set(...))"""
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        content = f.read().lstrip('\ufeff')
+    
+    subtitles = []
+    time_pattern = r'(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})'
+    for block in content.strip().split('\n\n'):
+        lines = block.strip().split('\n')
+        if len(lines) < 3:
+            continue
+        time_match = re.search(time_pattern, lines[1])
+        if time_match:
+            start_sec = SubtitleProcessor.parse_time(time_match.group(1).replace(',', '.'))
+            text = re.sub(r'<[^>]+>', '', ' '.join(lines[2:]).strip()).strip()
+            if text:
+                subtitles.append((start_sec, text))
+    subtitles = sorted(set(subtitles), key=lambda x: x[0])
+    
+    lrc_lines = [f"[{int(s // 60):02d}:{int(s % 60):02d}.{int((s % 60 * 100) % 100):02d}]{t}" for s, t in subtitles]
+    with open(lrc_path, 'w', encoding='utf-8') as f:
+        f.write("[by:youtube_to_mp3_optimized.py]\n" + '\n'.join(lrc_lines))
+
+VARIANTS = {"legacy": legacy_srt_to_lrc, "streaming": SubtitleProcessor.srt_to_lrc}
+
+def run_variant(name: str, srt_path: str, lrc_path: str):
+    """Convert in this process and print the measurements as JSON"""
+    started = time.perf_counter()
+    VARIANTS[name](srt_path, lrc_path)
+    seconds = time.perf_counter() - started
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    
+    # Traced separately, as tracemalloc slows allocation-heavy code down unevenly
+    tracemalloc.start()
+    VARIANTS[name](srt_path, lrc_path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(json.dumps({"seconds": seconds, "peak": peak, "max_rss": max_rss}))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SRT to LRC conversion memory")
+    parser.add_argument("--cues", type=int, default=200000, help="Cues in the generated SRT (default: 200000)")
+    parser.add_argument("--crlf", action="store_true", help="Generate the SRT with CRLF line endings")
+    parser.add_argument("--run", nargs=3, metavar=("VARIANT", "SRT", "LRC"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.run:
+        run_variant(*args.run)
+        return
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        srt_path, lrc_path = Path(temp_dir) / "captions.srt", Path(temp_dir) / "captions.lrc"
+        make_srt(srt_path, args.cues, args.crlf)
+        print(f"📝 {args.cues} cues, {srt_path.stat().st_size / (1 << 20):.1f}MB SRT")
+        
+        print(f"{'variant':<12}{'time':>10}{'peak heap':>12}{'max RSS':>12}")
+        for name in VARIANTS:
+            # A fresh interpreter per variant, so max RSS is not inherited from the other one
+            output = subprocess.run([sys.executable, __file__, "--run", name, str(srt_path), str(lrc_path)],
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f"{name:<12}{result['seconds']:>9.2f}s{result['peak'] / (1 << 20):>10.1f}MB"
+                  f"{result['max_rss'] / (1 << 20):>10.1f}MB")
+
+if __name__ == "__main__":
+    main()
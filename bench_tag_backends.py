@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compare lyrics tag backends: embed time and peak Python memory across MP3 sizes
+
+    python bench_tag_backends.py --sizes 1,10,100 --repeat 5
+"""
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from youtube_to_mp3_with_lyrics import Id3Tag, LyricsEmbedder, TAG_BACKENDS
+
+# One 128 kbps / 44.1 kHz MPEG-1 Layer III frame of silence
+FRAME = b'\xff\xfb\x90\x00' + b'\0' * 413
+
+def make_mp3(path: Path, size_mb: int):
+    """Write a silent MP3 of about size_mb MB with a small unpadded tag, like ffmpeg's output"""
+    chunk = FRAME * ((1 << 20) // len(FRAME))
+    with open(path, 'wb') as f:
+        f.write(Id3Tag.render([('TSSE', b'\x00Lavf60.16.100')], padding=0))
+        for _ in range(size_mb):
+            f.write(chunk)
+
+def make_lrc(path: Path, lines: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("[by:youtube_to_mp3_optimized.py]\n")
+        for i in range(lines):
+            f.write(f"[{i // 60:02d}:{i % 60:02d}.00]Line {i} of the synthetic lyrics ♪\n")
+
+def measure(func: Callable[[], None]) -> Tuple[float, int]:
+    """Run func once; returns (seconds, peak bytes allocated by Python)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        func()
+        return time.perf_counter() - started, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def cases(source: Path, work: Path, lrc: Path) -> Dict[str, Callable[[], None]]:
+    """Benchmarked operations; each starts from a fresh copy of source at work"""
+    lrc_text = lrc.read_text(encoding='utf-8')
+    result = {}
+    for name, backend in TAG_BACKENDS.items():
+        if backend.available():
+            result[name] = lambda backend=backend: backend().embed(str(work), lrc_text)
+    # The download path: tag and audio streamed from the source into a new file
+    result["builtin (copy)"] = lambda: LyricsEmbedder.write_with_lyrics(str(source), str(work), str(lrc))
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lyrics tag backends")
+    parser.add_argument("--sizes", default="1,10,100", help="Comma-separated MP3 sizes in MB (default: 1,10,100)")
+    parser.add_argument("--lines", type=int, default=2000, help="LRC lines to embed (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per backend and size (default: 5)")
+    parser.add_argument("--dir", help="Directory for the test files (default: a temporary directory)")
+    args = parser.parse_args()
+    
+    sizes = [int(s) for s in args.sizes.split(',')]
+    skipped = [name for name, backend in TAG_BACKENDS.items() if not backend.available()]
+    if skipped:
+        print(f"⚠️ Not installed, skipped: {', '.join(skipped)}")
+    
+    with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+        temp_dir = Path(temp_dir)
+        lrc = temp_dir / "lyrics.lrc"
+        make_lrc(lrc, args.lines)
+        
+        print(f"{'backend':<16}{'size':>8}{'median':>12}{'min':>12}{'peak mem':>12}")
+        for size_mb in sizes:
+            source, work = temp_dir / f"source_{size_mb}.mp3", temp_dir / "work.mp3"
+            make_mp3(source, size_mb)
+            for name, func in cases(source, work, lrc).items():
+                times: List[float] = []
+                peak = 0
+                for _ in range(args.repeat):
+                    shutil.copyfile(source, work)
+                    seconds, allocated = measure(func)
+                    times.append(seconds)
+                    peak = max(peak, allocated)
+                print(f"{name:<16}{size_mb:>6}MB{statistics.median(times) * 1000:>10.1f}ms"
+                      f"{min(times) * 1000:>10.1f}ms{peak / (1 << 20):>10.1f}MB")
+            source.unlink()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from youtube_to_mp3_with_lyrics import AsyncProcessRunner, AudioProcessor
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "killpg"), reason="needs process groups")
+
+# Starts a grandchild, reports both pids, then waits for the grandchild
+SPAWN_TREE = (
+    "import subprocess, sys, time\n"
+    "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+    "print(child.pid, flush=True)\n"
+    "child.wait()\n"
+)
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A killed grandchild stays a zombie until init reaps it
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(") ")[1][0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def wait_dead(pid: int, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not alive(pid):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+async def grandchild_of(runner: AsyncProcessRunner, timeout=None):
+    """Run SPAWN_TREE; returns the task and the grandchild pid once it is running"""
+    lines = asyncio.Queue()
+    task = asyncio.ensure_future(runner.run([sys.executable, "-c", SPAWN_TREE], timeout,
+                                            on_line=lines.put_nowait))
+    return task, int(await asyncio.wait_for(lines.get(), 10))
+
+
+def test_timeout_kills_the_process_tree():
+    async def main():
+        task, pid = await grandchild_of(AsyncProcessRunner(1), timeout=1)
+        with pytest.raises(Exception, match="timed out"):
+            await task
+        return pid
+    
+    assert wait_dead(asyncio.run(main()))
+
+
+def test_cancel_kills_the_process_tree():
+    async def main():
+        task, pid = await grandchild_of(AsyncProcessRunner(1))
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return pid
+    
+    assert wait_dead(asyncio.run(main()))
+
+
+def test_failed_command_raises_instead_of_exiting():
+    cmd = [sys.executable, "-c", "import sys; sys.exit(3)"]
+    with pytest.raises(Exception, match="Command failed"):
+        asyncio.run(AudioProcessor.run_cmd_async(cmd, timeout=10))
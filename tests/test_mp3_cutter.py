@@ -0,0 +1,120 @@
+import pytest
+
+from youtube_to_mp3_with_lyrics import Id3Tag, Mp3Cutter
+
+# 128 kbps / 44.1 kHz MPEG-1 Layer III: 417-byte frames of 1152 samples, 36 bytes of header and side info
+HEADER = b'\xff\xfb\x90\x00'
+FRAME_SIZE = 417
+FRAME_DURATION = 1152 / 44100
+ENCODER_TAG = Id3Tag.render([('TSSE', b'\x00Lavf60.16.100')], padding=0)
+
+
+def frame(number: int, reservoir: int = 0, payload: bytes = b'') -> bytes:
+    """A silent frame; main_data_begin is reservoir, and number marks the frame in its audio data"""
+    side = bytes([reservoir >> 1, (reservoir & 1) << 7]) + b'\0' * 30
+    body = payload or number.to_bytes(4, 'big')
+    return HEADER + side + body + b'\0' * (FRAME_SIZE - 36 - len(body))
+
+
+def frames(count: int, reservoir=None) -> list:
+    reservoir = reservoir or {}
+    return [frame(i, reservoir.get(i, 0)) for i in range(count)]
+
+
+def write_mp3(path, audio: list, tag: bytes = ENCODER_TAG):
+    path.write_bytes(tag + b''.join(audio))
+    return str(path)
+
+
+def test_index_counts_frames_after_the_tag(tmp_path):
+    source = write_mp3(tmp_path / "source.mp3", frames(100))
+    idx = Mp3Cutter.load_index(source)
+    assert len(idx["reservoir"]) == 100
+    assert idx["tag_end"] == idx["offsets"][0] == len(ENCODER_TAG)
+    assert idx["offsets"][-1] == len(ENCODER_TAG) + 100 * FRAME_SIZE
+    assert idx["frame_duration"] == pytest.approx(FRAME_DURATION)
+    assert idx["overhead"] == 36
+
+
+@pytest.mark.parametrize("marker", [b'Xing', b'Info'])
+def test_index_skips_the_info_frame(tmp_path, marker):
+    source = write_mp3(tmp_path / "source.mp3", [frame(0, payload=marker)] + frames(100))
+    idx = Mp3Cutter.load_index(source)
+    assert len(idx["reservoir"]) == 100
+    assert idx["offsets"][0] == len(ENCODER_TAG) + FRAME_SIZE
+
+
+def test_cut_copies_the_frames_covering_the_range(tmp_path):
+    audio = frames(100)
+    source = write_mp3(tmp_path / "source.mp3", audio)
+    output = tmp_path / "cut.mp3"
+    assert Mp3Cutter.cut(source, str(output), "00:01", "00:02")
+    
+    # Frame 38 starts 7 ms before 1 s; frame 77 ends after 2 s
+    first, last = int(1 / FRAME_DURATION), -int(-2 // FRAME_DURATION)
+    assert (first, last) == (38, 77)
+    assert 1 - first * FRAME_DURATION <= Mp3Cutter.MAX_ERROR
+    assert output.read_bytes() == ENCODER_TAG + b''.join(audio[first:last])
+
+
+def test_cut_to_the_end(tmp_path):
+    audio = frames(100)
+    source = write_mp3(tmp_path / "source.mp3", audio)
+    output = tmp_path / "cut.mp3"
+    assert Mp3Cutter.cut(source, str(output), "00:02")
+    assert output.read_bytes() == ENCODER_TAG + b''.join(audio[76:])
+
+
+def test_cut_backs_up_for_the_bit_reservoir(tmp_path):
+    # Frame 38 reads 400 bytes of earlier main data, and each frame holds 381: two frames are needed
+    audio = frames(100, reservoir={38: 400})
+    source = write_mp3(tmp_path / "source.mp3", audio)
+    output = tmp_path / "cut.mp3"
+    assert Mp3Cutter.cut(source, str(output), "00:01", "00:02")
+    assert output.read_bytes() == ENCODER_TAG + b''.join(audio[36:77])
+
+
+def test_cut_refuses_a_start_beyond_the_error_bound(tmp_path, monkeypatch):
+    # Backing up two frames for the reservoir moves the start about 60 ms early
+    monkeypatch.setattr(Mp3Cutter, "MAX_ERROR", 0.03)
+    output = tmp_path / "cut.mp3"
+    plain = write_mp3(tmp_path / "plain.mp3", frames(100))
+    assert Mp3Cutter.cut(plain, str(output), "00:01", "00:02")
+    
+    output.unlink()
+    reservoir = write_mp3(tmp_path / "reservoir.mp3", frames(100, reservoir={38: 400}))
+    assert not Mp3Cutter.cut(reservoir, str(output), "00:01", "00:02")
+    assert not output.exists()
+
+
+@pytest.mark.parametrize("start, end", [("00:02", "00:01"), ("00:05", None)])
+def test_cut_falls_back_on_an_empty_range(tmp_path, start, end):
+    # 100 frames are 2.6 s long
+    source = write_mp3(tmp_path / "source.mp3", frames(100))
+    output = tmp_path / "cut.mp3"
+    assert not Mp3Cutter.cut(source, str(output), start, end)
+    assert not output.exists()
+
+
+def test_cut_falls_back_without_frames(tmp_path):
+    output = tmp_path / "cut.mp3"
+    empty = tmp_path / "empty.mp3"
+    empty.write_bytes(b'')
+    assert not Mp3Cutter.cut(str(empty), str(output), "00:01")
+    junk = write_mp3(tmp_path / "junk.mp3", [b'\0' * FRAME_SIZE] * 10)
+    assert not Mp3Cutter.cut(junk, str(output), "00:01")
+    assert not output.exists()
+
+
+def test_cut_carries_the_lyrics_tag(tmp_path):
+    audio = frames(100)
+    source = write_mp3(tmp_path / "source.mp3", audio)
+    output = tmp_path / "cut.mp3"
+    lrc_text = "[00:00.00]¿Dónde estás?\n[00:00.50]♪\n"
+    index = Mp3Cutter.load_index(source)
+    assert Mp3Cutter.cut(source, str(output), "00:01", "00:02", lrc_text, index)
+    
+    data = output.read_bytes()
+    tag_size = Id3Tag.tag_size(data[:10])
+    assert Id3Tag.parse_frames(data[:tag_size]) == [('TSSE', b'\x00Lavf60.16.100'), Id3Tag.lyrics_frame(lrc_text)]
+    assert data[tag_size:] == b''.join(audio[38:77])
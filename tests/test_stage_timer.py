@@ -0,0 +1,46 @@
+import os
+import sys
+import threading
+
+import pytest
+
+from youtube_to_mp3_with_lyrics import ProcessRunner, StageTimer
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "wait4"), reason="needs os.wait4")
+
+
+@pytest.fixture
+def timer():
+    StageTimer.active = StageTimer()
+    yield StageTimer.active
+    StageTimer.active = None
+
+
+def burn(name: str, loops: int):
+    with StageTimer.measure(name):
+        returncode, _, _ = ProcessRunner.run([sys.executable, "-c", f"sum(range({loops}))"])
+        assert returncode == 0
+
+
+def test_concurrent_stages_only_count_their_own_children(timer):
+    threads = [threading.Thread(target=burn, args=("small", 10 ** 5)),
+               threading.Thread(target=burn, args=("big", 3 * 10 ** 7))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    stages = {stage["name"]: stage for stage in timer.summary()["stages"]}
+    big, small = stages["big"], stages["small"]
+    assert big["child_user"] + big["child_sys"] > 5 * (small["child_user"] + small["child_sys"])
+
+
+def test_bound_worker_threads_count_towards_the_callers_stage(timer):
+    with StageTimer.measure("outer"):
+        worker = threading.Thread(target=StageTimer.bind(burn), args=("inner", 10 ** 6))
+        worker.start()
+        worker.join()
+    
+    stages = {stage["name"]: stage for stage in timer.summary()["stages"]}
+    assert stages["inner"]["parent"] == "outer"
+    assert stages["outer"]["child_user"] >= stages["inner"]["child_user"] > 0
@@ -0,0 +1,109 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+from youtube_to_mp3_with_lyrics import AudioProcessor, Eyed3Backend, Id3Tag, LyricsEmbedder
+
+# Three 128 kbps / 44.1 kHz MPEG-1 Layer III frames of silence
+AUDIO = (b'\xff\xfb\x90\x00' + b'\0' * 413) * 3
+
+
+def syncsafe(n: int) -> bytes:
+    return bytes([(n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F])
+
+
+def v24_frame(frame_id: str, payload: bytes, format_flags: int = 0) -> bytes:
+    return frame_id.encode('latin-1') + syncsafe(len(payload)) + bytes([0, format_flags]) + payload
+
+
+def v24_tag(*frames: bytes) -> bytes:
+    body = b''.join(frames)
+    return b'ID3\x04\x00\x00' + syncsafe(len(body)) + body
+
+
+def read_tag(path) -> bytes:
+    with open(path, 'rb') as f:
+        head = f.read(10)
+        return head + f.read(Id3Tag.tag_size(head) - 10)
+
+
+def test_v24_text_frames_are_converted():
+    tag = v24_tag(v24_frame('TIT2', b'\x03Song\0'))
+    frames = Id3Tag.parse_frames(LyricsEmbedder.lyrics_tag(tag, "[00:01.00]hi"))
+    assert frames[0] == ('TIT2', b'\x01' + Id3Tag.utf16('Song'))
+    assert frames[1] == Id3Tag.lyrics_frame("[00:01.00]hi")
+
+
+def test_v24_frames_that_cannot_be_carried_over_are_not_dropped():
+    # UTF-8 cover art and links have no v2.3 form: the builtin writer must refuse the tag
+    for frame in (v24_frame('APIC', b'\x03image/jpeg\0\x03cover\0JPEG'),
+                  v24_frame('WXXX', b'\x03link\0https://example.com')):
+        tag = v24_tag(v24_frame('TIT2', b'\x03Song\0'), frame)
+        assert LyricsEmbedder.lyrics_tag(tag, "lyrics") is None
+
+
+def test_frames_with_format_flags_are_not_dropped():
+    tag = v24_tag(v24_frame('TALB', b'\x00Album\0', format_flags=0x01))
+    assert Id3Tag.parse_frames(tag) is None
+
+
+def test_binary_frames_are_kept():
+    apic = b'\x00image/jpeg\0\x03\0JPEG'
+    tag = v24_tag(v24_frame('APIC', apic), v24_frame('PRIV', b'\x03owner\0data'))
+    frames = Id3Tag.parse_frames(LyricsEmbedder.lyrics_tag(tag, "lyrics"))
+    assert [f for f, _ in frames] == ['APIC', 'PRIV', 'USLT']
+    assert frames[0][1] == apic
+
+
+@pytest.mark.parametrize("tagged", [False, True])
+def test_builtin_tag_matches_eyed3(tmp_path, tagged):
+    pytest.importorskip("eyed3")
+    source = tmp_path / "source.mp3"
+    title = Id3Tag.render([('TIT2', b'\x01' + Id3Tag.utf16('Canción'))]) if tagged else b''
+    source.write_bytes(title + AUDIO)
+    lrc = tmp_path / "song.lrc"
+    lrc.write_text("[00:01.00]¿Dónde estás?\n[00:02.50]♪\n", encoding='utf-8')
+    
+    builtin = tmp_path / "builtin.mp3"
+    LyricsEmbedder.write_with_lyrics(str(source), str(builtin), str(lrc), "builtin")
+    fallback = tmp_path / "eyed3.mp3"
+    shutil.copy2(source, fallback)
+    Eyed3Backend().embed(str(fallback), lrc.read_text(encoding='utf-8'))
+    
+    # Layout (frame order, padding) may differ; every frame must be identical byte for byte
+    builtin_tag, fallback_tag = read_tag(builtin), read_tag(fallback)
+    assert builtin_tag[3:5] == fallback_tag[3:5] == b'\x03\x00'
+    assert sorted(Id3Tag.parse_frames(builtin_tag)) == sorted(Id3Tag.parse_frames(fallback_tag))
+    assert builtin.read_bytes()[len(builtin_tag):] == fallback.read_bytes()[len(fallback_tag):] == AUDIO
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="stub encoder is a shebang script")
+def test_encode_streams_lyrics_tag(tmp_path, monkeypatch):
+    # A stub ffmpeg that writes a tagged MP3 to stdout, like the real encoder with -f mp3 pipe:1
+    encoded = tmp_path / "encoded.mp3"
+    encoder_tag = Id3Tag.render([('TSSE', b'\x00Lavf60.16.100')], padding=0)
+    encoded.write_bytes(encoder_tag + AUDIO)
+    stub = tmp_path / "bin" / "ffmpeg"
+    stub.parent.mkdir()
+    stub.write_text(f"#!{sys.executable}\n"
+                    "import sys\n"
+                    "assert sys.argv[-1] == 'pipe:1'\n"
+                    f"sys.stdout.buffer.write(open({str(encoded)!r}, 'rb').read())\n")
+    stub.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{stub.parent}{os.pathsep}{os.environ['PATH']}")
+    
+    source = tmp_path / "source.webm"
+    source.write_bytes(b'not decoded by the stub')
+    lrc = tmp_path / "song.lrc"
+    lrc_text = "[00:01.00]¿Dónde estás?\n[00:02.50]♪\n"
+    lrc.write_text(lrc_text, encoding='utf-8')
+    output = tmp_path / "song.mp3"
+    AudioProcessor.convert_to_mp3(str(source), str(output), lrc_path=str(lrc))
+    
+    tag = read_tag(output)
+    assert tag[3:5] == b'\x03\x00'
+    assert Id3Tag.parse_frames(tag) == [('TSSE', b'\x00Lavf60.16.100'), Id3Tag.lyrics_frame(lrc_text)]
+    assert output.read_bytes()[len(tag):] == AUDIO
+    assert not (tmp_path / "song.mp3.part").exists()
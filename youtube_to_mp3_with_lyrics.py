@@ -3,17 +3,44 @@
 import os
 import subprocess
 import sys
-import eyed3
 import argparse
 import re
 import shutil
-from typing import List, Tuple, Dict, Optional
+import copy
+import sqlite3
+import hashlib
+import json
+import bisect
+import importlib.util
+import threading
+import queue
+import math
+import mmap
+import time
+import asyncio
+import signal
+import weakref
+import functools
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from typing import List, Tuple, Dict, Optional, Callable, IO, Iterable, Iterator
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; --report then leaves out child CPU time and block I/O
+    resource = None
 
 class Config:
     """Centralized configuration management"""
     def __init__(self, args):
         self.url = args.url
+        self.batch = args.batch
+        self.library = args.library
+        self.jobs = max(1, args.jobs or 1)
         self.merge_mode = args.merge
         self.audio_path = args.audio
         self.subtitle_path = args.subtitle
@@ -24,10 +51,258 @@ class Config:
         self.lang = args.lang or "en"
         self.enhance_stereo = args.enhance_stereo
         self.no_cleanup = args.no_cleanup
+        self.engine = args.engine or "auto"
+        self.seek = args.seek or "auto"
+        self.tag_backend = args.tag_backend or "builtin"
+        self.segments = self.parse_segments(args.segments, args.segments_file)
+        
+        self.split_chapters = args.split_chapters
+        self.probe_ttl = args.probe_ttl * 3600
+        
+        if self.segments and (self.start_time or self.end_time):
+            sys.exit("❌ --segments cannot be combined with --start/--end")
+        if self.split_chapters and (self.segments or self.start_time or self.end_time or self.merge_mode):
+            sys.exit("❌ --split-chapters only works in download mode without --segments/--start/--end")
+        # Fail before downloading and encoding rather than at the tagging step
+        backend = TAG_BACKENDS[self.tag_backend]
+        if not backend.available():
+            sys.exit(f"❌ --tag-backend {backend.name} requires the {backend.module} package "
+                     f"(pip install {backend.module})")
         
         # Ensure directories exist
         self.output_dir.mkdir(exist_ok=True)
         self.source_dir.mkdir(exist_ok=True)
+    
+    @staticmethod
+    def parse_segments(spec: Optional[str], spec_file: Optional[str]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Parse START-END segments from a comma-separated list and/or a file (one per line)"""
+        items = spec.split(',') if spec else []
+        if spec_file:
+            with open(spec_file, 'r', encoding='utf-8') as f:
+                items.extend(line for line in f if not line.strip().startswith('#'))
+        
+        segments = []
+        for item in (i.strip() for i in items):
+            if not item:
+                continue
+            start, sep, end = (part.strip() for part in item.partition('-'))
+            try:
+                if not sep or not (start or end):
+                    raise ValueError(item)
+                AudioProcessor.plan_seek(start or None, end or None)
+            except ValueError:
+                sys.exit(f"❌ Invalid segment '{item}' (expected START-END, e.g. 1:30-2:45)")
+            segments.append((start or None, end or None))
+        return segments
+
+class StageTimer:
+    """Per-stage wall time, child CPU time and bytes read/written, written as JSON by --report
+
+    Stages only count their own thread's I/O and the children they waited for, so stages
+    running side by side in batch mode do not share counters; run totals are process-wide.
+    """
+    
+    # Timer collecting stages for this run (None disables timing)
+    active: Optional["StageTimer"] = None
+    
+    def __init__(self):
+        self.started = time.time()
+        self.origin = self.sample()
+        self.stages: List[Dict[str, object]] = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+    
+    @staticmethod
+    def child_usage(usage) -> Dict[str, float]:
+        """Child counters from a struct_rusage"""
+        return {"child_user": usage.ru_utime, "child_sys": usage.ru_stime,
+                "child_read_bytes": usage.ru_inblock * 512, "child_write_bytes": usage.ru_oublock * 512}
+    
+    @staticmethod
+    def read_io(values: Dict[str, float], path: str):
+        try:
+            # rchar/wchar count all reads and writes, read_bytes/write_bytes only those reaching storage
+            with open(path, 'r') as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    if key in ("rchar", "wchar", "read_bytes", "write_bytes"):
+                        values[key] = int(value)
+        except OSError:
+            pass
+    
+    @classmethod
+    def sample(cls) -> Dict[str, float]:
+        """Process-wide counters; children count once they have been waited for"""
+        values = {"wall": time.monotonic()}
+        if resource is not None:
+            values.update(cls.child_usage(resource.getrusage(resource.RUSAGE_CHILDREN)))
+        cls.read_io(values, '/proc/self/io')
+        return values
+    
+    @classmethod
+    def thread_sample(cls) -> Dict[str, float]:
+        """Counters of the calling thread only (children are credited by charge())"""
+        values = {"wall": time.monotonic()}
+        cls.read_io(values, '/proc/thread-self/io')
+        return values
+    
+    @classmethod
+    def charge(cls, usage):
+        """Credit a waited-for child's struct_rusage to the calling thread's open stages"""
+        timer = cls.active
+        if timer is None:
+            return
+        with timer.lock:
+            for frame in timer.local.__dict__.get("stack", []):
+                for key, value in cls.child_usage(usage).items():
+                    frame[key] += value
+    
+    @classmethod
+    def bind(cls, func: Callable) -> Callable:
+        """Wrap func so that, run on another thread, it counts towards the caller's open stages"""
+        timer = cls.active
+        if timer is None:
+            return func
+        stack = list(timer.local.__dict__.get("stack", []))
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            saved = timer.local.__dict__.get("stack")
+            timer.local.stack = list(stack)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.local.stack = saved if saved is not None else []
+        return wrapper
+    
+    @classmethod
+    @contextmanager
+    def measure(cls, name: str):
+        """Time the enclosed block as stage `name` when a timer is active"""
+        timer = cls.active
+        if timer is None:
+            yield
+            return
+        
+        stack = timer.local.__dict__.setdefault("stack", [])
+        parent = stack[-1]["name"] if stack else None
+        # Children reaped while the stage is open are added to its frame (see charge())
+        frame = {"name": name, "child_user": 0.0, "child_sys": 0.0, "child_read_bytes": 0, "child_write_bytes": 0}
+        stack.append(frame)
+        before = timer.thread_sample()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            after = timer.thread_sample()
+            stack.pop()
+            stage = {"name": name, "parent": parent, "thread": threading.current_thread().name,
+                     "start": round(before["wall"] - timer.origin["wall"], 6), "ok": ok}
+            stage.update({k: round(after[k] - before[k], 6) for k in after if k in before})
+            with timer.lock:
+                stage.update({k: round(v, 6) for k, v in frame.items() if k != "name"})
+                timer.stages.append(stage)
+    
+    @classmethod
+    def timed(cls, name: str) -> Callable:
+        """Decorator form of measure()"""
+        def decorate(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with cls.measure(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+    
+    def summary(self) -> Dict[str, object]:
+        now = self.sample()
+        with self.lock:
+            stages = list(self.stages)
+        
+        # Nested stages (e.g. subtitles inside download) are also part of their parent's totals
+        totals: Dict[str, Dict[str, float]] = {}
+        for stage in stages:
+            total = totals.setdefault(stage["name"], {"count": 0})
+            total["count"] += 1
+            for key, value in stage.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool) and key != "start":
+                    total[key] = round(total.get(key, 0) + value, 6)
+        
+        return {"command": sys.argv, "started": self.started,
+                "total": {k: round(now[k] - self.origin[k], 6) for k in now if k in self.origin},
+                "stages": stages, "totals": totals}
+    
+    def write(self, report_path: str):
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"📊 Timing report: {report_path}")
+
+class CueStore:
+    """Sorted subtitle cues in compact columns (start times in ms, text in one UTF-8 buffer)"""
+    
+    def __init__(self):
+        self.starts = array('q')
+        self.text_offsets = array('q')
+        self.text_lengths = array('q')
+        self.buffer = bytearray()
+    
+    @classmethod
+    def from_cues(cls, cues: Iterable[Tuple[float, float, str]]) -> 'CueStore':
+        """Build a store from (start, end, text) cues in seconds (LRC only uses the start)"""
+        store = cls()
+        for start, _, text in cues:
+            store.add(round(start * 1000), text)
+        return store
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def text(self, i: int) -> str:
+        """Text of cue i"""
+        offset = self.text_offsets[i]
+        return self.buffer[offset:offset + self.text_lengths[i]].decode('utf-8')
+    
+    def add(self, start_ms: int, text: str) -> bool:
+        """Insert a cue in start order; False if the same cue is already stored"""
+        data = text.encode('utf-8')
+        pos = bisect.bisect_right(self.starts, start_ms)
+        
+        # Duplicates share the start time, so only the cues just before pos need checking
+        j = pos - 1
+        while j >= 0 and self.starts[j] == start_ms:
+            offset = self.text_offsets[j]
+            if self.text_lengths[j] == len(data) and self.buffer[offset:offset + len(data)] == data:
+                return False
+            j -= 1
+        
+        offset = len(self.buffer)
+        self.buffer += data
+        if pos == len(self.starts):
+            # In-order input (the common case) only appends
+            self.starts.append(start_ms)
+            self.text_offsets.append(offset)
+            self.text_lengths.append(len(data))
+        else:
+            self.starts.insert(pos, start_ms)
+            self.text_offsets.insert(pos, offset)
+            self.text_lengths.insert(pos, len(data))
+        return True
+    
+    def window(self, start_ms: int = None, end_ms: int = None) -> Tuple[int, int]:
+        """Index range of cues starting within [start_ms, end_ms] (either bound may be None)"""
+        lo = 0 if start_ms is None else bisect.bisect_left(self.starts, start_ms)
+        hi = len(self.starts) if end_ms is None else bisect.bisect_right(self.starts, end_ms)
+        return lo, max(lo, hi)
+    
+    def write_lrc(self, f: IO[str], offset_ms: int = 0, lo: int = 0, hi: int = None):
+        """Write cues lo..hi-1 as newline-separated LRC lines, shifted back by offset_ms"""
+        separator = ''
+        for i in range(lo, len(self.starts) if hi is None else hi):
+            ms = self.starts[i] - offset_ms
+            if ms >= 0:
+                f.write(f"{separator}{SubtitleProcessor.ms_to_lrc_time(ms)}{self.text(i)}")
+                separator = '\n'
 
 class SubtitleProcessor:
     """Subtitle processor"""
@@ -49,130 +324,730 @@ class SubtitleProcessor:
         return h * 3600 + m * 60 + s
     
     @staticmethod
-    def seconds_to_lrc_time(seconds: float) -> str:
-        """Convert seconds to LRC time format"""
-        if seconds < 0:
-            seconds = 0
-        minutes = int(seconds // 60)
-        secs = seconds % 60
-        centiseconds = int((secs * 100) % 100)
-        return f"[{minutes:02d}:{int(secs):02d}.{centiseconds:02d}]"
+    def format_time(seconds: float) -> str:
+        """Format seconds as HH:MM:SS.mmm"""
+        ms = round(seconds * 1000)
+        return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+    
+    @staticmethod
+    def ms_to_lrc_time(ms: int) -> str:
+        """Convert milliseconds to LRC time format"""
+        ms = max(ms, 0)
+        return f"[{ms // 60000:02d}:{ms // 1000 % 60:02d}.{ms % 1000 // 10:02d}]"
+    
+    TIME_PATTERN = re.compile(r'(\d{2}:\d{2}:\d{2}[,.]\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2}[,.]\d{3})')
+    
+    @classmethod
+    def parse_cue(cls, lines: List[str]) -> Optional[Tuple[float, float, str]]:
+        """Parse one SRT block into (start, end, text)"""
+        # The timing line follows the cue number, which some files omit
+        for i, line in enumerate(lines[:2]):
+            time_match = cls.TIME_PATTERN.search(line)
+            if time_match:
+                break
+        else:
+            return None
+        
+        try:
+            start_sec = cls.parse_time(time_match.group(1).replace(',', '.'))
+            end_sec = cls.parse_time(time_match.group(2).replace(',', '.'))
+        except ValueError:
+            return None
+        
+        text = ' '.join(lines[i + 1:]).strip()
+        text = re.sub(r'<[^>]+>', '', text).strip()  # Remove HTML tags
+        return (start_sec, end_sec, text) if text else None
+    
+    @classmethod
+    def iter_srt(cls, srt_path: str) -> Iterator[Tuple[float, float, str]]:
+        """Yield (start, end, text) cues from an SRT file one block at a time"""
+        # utf-8-sig drops the BOM; universal newlines and strip() take care of CRLF
+        with open(srt_path, 'r', encoding='utf-8-sig') as f:
+            block = []
+            for line in f:
+                line = line.strip()
+                if line:
+                    block.append(line)
+                    continue
+                if block:
+                    cue = cls.parse_cue(block)
+                    if cue:
+                        yield cue
+                    block = []
+            if block:
+                cue = cls.parse_cue(block)
+                if cue:
+                    yield cue
     
     @classmethod
     def srt_to_lrc(cls, srt_path: str, lrc_path: str, start_time: str = None, end_time: str = None):
         """Convert SRT to LRC"""
-        with open(srt_path, 'r', encoding='utf-8') as f:
-            content = f.read().lstrip('\ufeff')
+        cls.srt_to_lrc_windows(srt_path, [(start_time, end_time, lrc_path)])
+    
+    @classmethod
+    @StageTimer.timed("lrc")
+    def srt_to_lrc_windows(cls, srt_path: str, windows: List[Tuple[Optional[str], Optional[str], str]]):
+        """Convert SRT to one LRC per (start, end, lrc_path) window, re-based to the window start"""
+        cues = CueStore.from_cues(cls.iter_srt(srt_path))
+        
+        for start_time, end_time, lrc_path in windows:
+            # Either bound may be open
+            start_ms = round(cls.parse_time(start_time) * 1000) if start_time else None
+            end_ms = round(cls.parse_time(end_time) * 1000) if end_time else None
+            lo, hi = cues.window(start_ms, end_ms)
+            
+            with open(lrc_path, 'w', encoding='utf-8') as f:
+                f.write("[by:youtube_to_mp3_optimized.py]\n")
+                cues.write_lrc(f, start_ms or 0, lo, hi)
+
+class Mp3Cutter:
+    """Lossless MP3 trimming on MPEG frame boundaries"""
+    
+    # Largest allowed difference between requested and actual start (seconds)
+    MAX_ERROR = 0.1
+    CHUNK_SIZE = 1 << 20
+    
+    # Layer III bitrates (kbps) for MPEG-1 and MPEG-2/2.5
+    BITRATES = {
+        1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+        2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    }
+    # Sample rates by version bits: MPEG-1, MPEG-2, MPEG-2.5
+    SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+    
+    @classmethod
+    def parse_header(cls, data, pos: int) -> Optional[Dict[str, int]]:
+        """Parse a Layer III frame header at pos"""
+        if pos + 4 > len(data):
+            return None
+        h = int.from_bytes(data[pos:pos + 4], 'big')
+        version, layer = (h >> 19) & 3, (h >> 17) & 3
+        bitrate_idx, rate_idx = (h >> 12) & 0xF, (h >> 10) & 3
+        
+        # Sync word, Layer III only, no free-format or reserved values
+        if (h >> 21) != 0x7FF or version == 1 or layer != 1 or bitrate_idx in (0, 15) or rate_idx == 3:
+            return None
+        
+        mpeg1 = version == 3
+        mono = ((h >> 6) & 3) == 3
+        bitrate = cls.BITRATES[1 if mpeg1 else 2][bitrate_idx] * 1000
+        sample_rate = cls.SAMPLE_RATES[version][rate_idx]
+        length = (144 if mpeg1 else 72) * bitrate // sample_rate + ((h >> 9) & 1)
+        side_start = pos + (4 if (h >> 16) & 1 else 6)
+        side_size = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        
+        if side_start + side_size > len(data):
+            return None
+        
+        # main_data_begin: how many bytes of earlier frames this frame's audio data uses
+        if mpeg1:
+            reservoir = (data[side_start] << 1) | (data[side_start + 1] >> 7)
+        else:
+            reservoir = data[side_start]
+        
+        return {"length": length, "sample_rate": sample_rate, "samples": 1152 if mpeg1 else 576,
+                "side_end": side_start + side_size, "reservoir": reservoir}
+    
+    @classmethod
+    def index(cls, data) -> Optional[Dict[str, object]]:
+        """Build a frame index (offsets and reservoir use) over the MP3 data"""
+        size = len(data)
+        pos = 0
         
-        # Parse SRT
-        subtitles = []
-        time_pattern = r'(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})'
+        # Skip ID3v2 tag
+        if size >= 10 and data[0:3] == b'ID3':
+            pos = 10 + ((data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9])
+            if data[5] & 0x10:
+                pos += 10
+        tag_end = pos
         
-        for block in content.strip().split('\n\n'):
-            lines = block.strip().split('\n')
-            if len(lines) < 3:
+        offsets, reservoir = array('q'), array('H')
+        sample_rate = samples = None
+        overhead = 0
+        
+        while pos < size:
+            frame = cls.parse_header(data, pos)
+            if not offsets and (frame is None or cls.parse_header(data, pos + frame["length"]) is None):
+                # Resync to the first pair of consecutive frames
+                pos = data.find(b'\xff', pos + 1)
+                if pos < 0 or pos - tag_end > cls.CHUNK_SIZE:
+                    return None
                 continue
+            if frame is None:
+                break  # ID3v1/APE tag or trailing junk
             
-            time_match = re.search(time_pattern, lines[1])
-            if time_match:
-                try:
-                    start_sec = cls.parse_time(time_match.group(1).replace(',', '.'))
-                    text = ' '.join(lines[2:]).strip()
-                    text = re.sub(r'<[^>]+>', '', text).strip()  # Remove HTML tags
-                    
-                    if text:
-                        subtitles.append((start_sec, text))
-                except ValueError:
+            if sample_rate is None:
+                sample_rate, samples = frame["sample_rate"], frame["samples"]
+                overhead = frame["side_end"] - pos
+                
+                # Xing/Info/VBRI header frame carries no audio and would be wrong after a cut
+                if data[frame["side_end"]:frame["side_end"] + 4] in (b'Xing', b'Info') or \
+                        data[pos + 36:pos + 40] == b'VBRI':
+                    pos += frame["length"]
                     continue
+            elif frame["sample_rate"] != sample_rate:
+                return None
+            
+            offsets.append(pos)
+            reservoir.append(frame["reservoir"])
+            pos += frame["length"]
+        
+        if not offsets:
+            return None
+        
+        offsets.append(min(pos, size))
+        return {"tag_end": tag_end, "offsets": offsets, "reservoir": reservoir,
+                "frame_duration": samples / sample_rate, "overhead": overhead}
+    
+    @classmethod
+    def load_index(cls, input_path: str) -> Optional[Dict[str, object]]:
+        """Build the frame index of a file once, for several cuts from it"""
+        with open(input_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return cls.index(mm)
+    
+    @classmethod
+    def cut(cls, input_path: str, output_path: str, start_time: str = None, end_time: str = None,
+            lrc_text: str = None, index: Dict[str, object] = None) -> bool:
+        """Copy the frames covering [start, end]; False if the precision cannot be met
+
+        index is the file's load_index() result; without it the file is indexed for this cut.
+        """
+        start_sec = SubtitleProcessor.parse_time(start_time) if start_time else 0.0
+        end_sec = SubtitleProcessor.parse_time(end_time) if end_time else None
+        
+        with open(input_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                idx = index or cls.index(mm)
+                if not idx:
+                    return False
+                
+                offsets, reservoir = idx["offsets"], idx["reservoir"]
+                frame_count = len(reservoir)
+                duration = idx["frame_duration"]
+                
+                first = int(start_sec / duration)
+                last = frame_count if end_sec is None else min(frame_count, math.ceil(end_sec / duration))
+                if first >= last:
+                    return False
+                
+                # Back up far enough to include the bit reservoir bytes the first frame needs
+                needed, margin = reservoir[first], 0
+                while needed > 0 and first - margin > 0:
+                    margin += 1
+                    needed -= offsets[first - margin + 1] - offsets[first - margin] - idx["overhead"]
+                
+                error = start_sec - (first - margin) * duration
+                if error > cls.MAX_ERROR:
+                    return False
+                first -= margin
+                
+                tag = mm[:idx["tag_end"]]
+                if lrc_text is not None:
+                    tag = LyricsEmbedder.lyrics_tag(tag, lrc_text)
+                    if tag is None:
+                        return False
+                
+                # ID3v2 tag followed by the selected frames, copied sequentially
+                with memoryview(mm) as view, open(output_path, 'wb') as out:
+                    out.write(tag)
+                    for chunk_start in range(offsets[first], offsets[last], cls.CHUNK_SIZE):
+                        out.write(view[chunk_start:min(chunk_start + cls.CHUNK_SIZE, offsets[last])])
+        
+        print(f"✂️ Lossless MP3 cut: frames {first}-{last} ({error * 1000:.0f} ms before start)")
+        return True
+
+class StreamTail:
+    """Keeps the last `limit` bytes of a child's output and passes each line to on_line"""
+    
+    CHUNK_SIZE = 64 * 1024
+    LINE_BREAK = re.compile(rb'[\r\n]')
+    
+    def __init__(self, limit: Optional[int] = 64 * 1024, on_line: Optional[Callable[[str], None]] = None):
+        self.limit = limit  # None keeps everything (for output that is parsed afterwards)
+        self.on_line = on_line
+        self.data = bytearray()
+        self.partial = bytearray()
+    
+    def feed(self, chunk: bytes):
+        self.data += chunk
+        if self.limit is not None and len(self.data) > self.limit:
+            del self.data[:len(self.data) - self.limit]
+        
+        if self.on_line:
+            # Progress output redraws one line with \r, so both \r and \n end a line
+            self.partial += chunk
+            lines = self.LINE_BREAK.split(self.partial)
+            self.partial = bytearray(lines.pop())
+            if len(self.partial) > self.CHUNK_SIZE:
+                del self.partial[:len(self.partial) - self.CHUNK_SIZE]
+            for line in lines:
+                if line:
+                    self.on_line(line.decode('utf-8', 'replace'))
+    
+    def close(self):
+        if self.on_line and self.partial:
+            self.on_line(self.partial.decode('utf-8', 'replace'))
+        self.partial = bytearray()
+    
+    def drain(self, stream: IO[bytes]):
+        """Read a pipe until EOF"""
+        for chunk in iter(lambda: stream.read1(self.CHUNK_SIZE), b''):
+            self.feed(chunk)
+        self.close()
+    
+    async def drain_async(self, stream: asyncio.StreamReader):
+        while True:
+            chunk = await stream.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            self.feed(chunk)
+        self.close()
+    
+    def text(self) -> str:
+        return self.data.decode('utf-8', 'replace')
+
+class ProcessRunner:
+    """Runs a child process, streaming its output instead of holding all of it in memory"""
+    
+    # Output kept for error messages (bytes per stream)
+    TAIL_SIZE = 64 * 1024
+    
+    @classmethod
+    def run(cls, cmd: List[str], keep_stdout: bool = False,
+            on_line: Optional[Callable[[str], None]] = None,
+            consume: Optional[Callable[[IO[bytes]], None]] = None) -> Tuple[int, str, str]:
+        """Run cmd to completion; returns (returncode, stdout, stderr tail)
+
+        With consume, the stdout pipe is handed to it instead (and "" is returned for stdout).
+        """
+        stdout = StreamTail(None if keep_stdout else cls.TAIL_SIZE, on_line)
+        stderr = StreamTail(cls.TAIL_SIZE, on_line)
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        # Drain stderr concurrently so a chatty child never blocks on a full pipe
+        reader = threading.Thread(target=stderr.drain, args=(proc.stderr,), daemon=True)
+        reader.start()
+        try:
+            if consume:
+                consume(proc.stdout)
+            else:
+                stdout.drain(proc.stdout)
+        except BaseException:
+            proc.kill()
+            raise
+        finally:
+            proc.stdout.close()
+            cls.wait(proc)
+            reader.join()
+        return proc.returncode, stdout.text(), stderr.text()
+    
+    @staticmethod
+    def wait(proc: subprocess.Popen):
+        """Wait for proc, crediting its CPU time and block I/O to the current stages"""
+        if not hasattr(os, "wait4"):
+            proc.wait()
+            return
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        StageTimer.charge(usage)
+
+class AsyncProcessRunner:
+    """Runs child processes from asyncio with a concurrency limit, timeout and tree kill"""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        # One semaphore per event loop, as asyncio primitives are bound to a loop
+        self.semaphores = weakref.WeakKeyDictionary()
+    
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self.semaphores:
+            self.semaphores[loop] = asyncio.Semaphore(self.limit)
+        return self.semaphores[loop]
+    
+    @staticmethod
+    def kill(proc: asyncio.subprocess.Process):
+        """Kill the child and everything it started (yt-dlp runs ffmpeg itself)"""
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            pass
+    
+    async def run(self, cmd: List[str], timeout: Optional[float] = None, keep_stdout: bool = False,
+                  on_line: Optional[Callable[[str], None]] = None) -> Tuple[int, str, str]:
+        """Run cmd once a slot is free; returns (returncode, stdout, stderr tail)"""
+        stdout = StreamTail(None if keep_stdout else ProcessRunner.TAIL_SIZE, on_line)
+        stderr = StreamTail(ProcessRunner.TAIL_SIZE, on_line)
+        async with self.semaphore():
+            # A new session makes the child a process group leader, so kill() reaches its children
+            proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE,
+                                                        stderr=asyncio.subprocess.PIPE,
+                                                        start_new_session=True)
+            try:
+                await asyncio.wait_for(asyncio.gather(stdout.drain_async(proc.stdout),
+                                                      stderr.drain_async(proc.stderr),
+                                                      proc.wait()), timeout)
+            except asyncio.TimeoutError:
+                self.kill(proc)
+                await proc.wait()
+                raise Exception(f"Command timed out after {timeout:g}s: {cmd[0]}")
+            except BaseException:
+                # Cancelled: do not leave the child running
+                self.kill(proc)
+                await proc.wait()
+                raise
+        return proc.returncode, stdout.text(), stderr.text()
+
+class FfmpegProgress:
+    """Turns ffmpeg -progress output into out_time, speed, bitrate and ETA reports"""
+    
+    DURATION = re.compile(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)')
+    # Seconds between printed reports per output
+    PRINT_INTERVAL = 5.0
+    last_printed: Dict[str, float] = {}
+    
+    def __init__(self, callback: Callable[[Dict[str, object]], None], label: str,
+                 duration: Optional[float] = None, offset: float = 0.0):
+        self.callback = callback
+        self.label = label
+        # Without a known length, the input duration from ffmpeg's log minus the seek offset is used
+        self.duration = duration
+        self.offset = offset
+        self.values: Dict[str, str] = {}
+        self.started = time.monotonic()
+    
+    def feed(self, line: str):
+        if self.duration is None:
+            match = self.DURATION.search(line)
+            if match:
+                hours, minutes, seconds = match.groups()
+                self.duration = max(0.0, int(hours) * 3600 + int(minutes) * 60 + float(seconds) - self.offset)
+                return
         
-        # Sort and deduplicate
-        subtitles = sorted(set(subtitles), key=lambda x: x[0])
+        key, sep, value = line.partition('=')
+        if not sep:
+            return
+        self.values[key.strip()] = value.strip()
+        # Each progress block ends with progress=continue (or end for the last one)
+        if key.strip() == "progress":
+            self.callback(self.report(value.strip() == "end"))
+    
+    def report(self, done: bool) -> Dict[str, object]:
+        def number(key: str, suffix: str = "") -> Optional[float]:
+            try:
+                return float(self.values.get(key, "").strip().rstrip(suffix))
+            except ValueError:
+                return None
         
-        # Time filtering
-        offset = 0
-        if start_time and end_time:
-            start_sec = cls.parse_time(start_time)
-            end_sec = cls.parse_time(end_time)
-            subtitles = [(s, t) for s, t in subtitles if start_sec <= s <= end_sec]
-            offset = start_sec
+        out_time = number("out_time_us")
+        out_time = out_time / 1e6 if out_time is not None else None
+        speed = number("speed", "x")
+        eta = None
+        if self.duration and out_time is not None and speed:
+            eta = max(0.0, self.duration - out_time) / speed
+        return {"label": self.label, "out_time": out_time, "duration": self.duration,
+                "percent": min(100.0, out_time / self.duration * 100) if self.duration and out_time else None,
+                "speed": speed, "bitrate_kbps": number("bitrate", "kbits/s"), "eta": 0.0 if done else eta,
+                "elapsed": time.monotonic() - self.started, "done": done}
+    
+    @classmethod
+    def print_report(cls, report: Dict[str, object]):
+        """Progress callback for the CLI (--progress)"""
+        now = time.monotonic()
+        if not report["done"] and now - cls.last_printed.get(report["label"], 0.0) < cls.PRINT_INTERVAL:
+            return
+        cls.last_printed[report["label"]] = now
         
-        # Generate LRC
-        lrc_lines = [f"{cls.seconds_to_lrc_time(s - offset)}{t}" 
-                    for s, t in subtitles if s - offset >= 0]
+        def fmt(seconds: Optional[float]) -> str:
+            return SubtitleProcessor.format_time(seconds)[:8] if seconds is not None else "?"
         
-        with open(lrc_path, 'w', encoding='utf-8') as f:
-            f.write("[by:youtube_to_mp3_optimized.py]\n" + '\n'.join(lrc_lines))
+        parts = [f"{fmt(report['out_time'])} / {fmt(report['duration'])}"]
+        if report["percent"] is not None:
+            parts.append(f"{report['percent']:.0f}%")
+        if report["speed"] is not None:
+            parts.append(f"{report['speed']:.1f}x")
+        if report["bitrate_kbps"] is not None:
+            parts.append(f"{report['bitrate_kbps']:.0f} kbps")
+        if report["eta"] is not None:
+            parts.append(f"ETA {fmt(report['eta'])}")
+        print(f"{'✅' if report['done'] else '⏳'} {Path(report['label']).name}: {' '.join(parts)}")
 
 class AudioProcessor:
     """Audio processor"""
     
-    @staticmethod
-    def run_cmd(cmd: List[str], quiet: bool = False) -> str:
+    # Concurrent ffmpeg children when driven from asyncio
+    ASYNC_RUNNER = AsyncProcessRunner(os.cpu_count() or 1)
+    # Concurrent ffmpeg children across all threads (pipeline workers and per-segment pools)
+    ENCODE_SLOTS = threading.BoundedSemaphore(os.cpu_count() or 1)
+    # Called with FfmpegProgress reports while ffmpeg runs (None disables progress output)
+    progress_callback: Optional[Callable[[Dict[str, object]], None]] = None
+    
+    @classmethod
+    def with_progress(cls, cmd: List[str], pipe: str, duration: Optional[float] = None,
+                      offset: float = 0.0, label: str = None) -> Tuple[List[str], Optional[Callable[[str], None]]]:
+        """Add -progress output to an ffmpeg command; returns (cmd, line parser)"""
+        if not cls.progress_callback or cmd[0] != "ffmpeg":
+            return cmd, None
+        progress = FfmpegProgress(cls.progress_callback, label or cmd[-1], duration, offset)
+        return [cmd[0], "-progress", pipe, "-nostats", *cmd[1:]], progress.feed
+    
+    @classmethod
+    def run_cmd(cls, cmd: List[str], quiet: bool = False, duration: Optional[float] = None,
+                offset: float = 0.0) -> str:
         """Execute command"""
         if not quiet:
             print(f"▶️ {' '.join(cmd)}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
-        if result.returncode != 0 and not quiet:
-            print(f"❌ Command failed: {result.stderr}")
-            sys.exit(1)
+        cmd, on_line = cls.with_progress(cmd, "pipe:1", duration, offset)
+        with cls.ENCODE_SLOTS:
+            returncode, stdout, stderr = ProcessRunner.run(cmd, on_line=on_line)
+        if returncode != 0 and not quiet:
+            # Raise rather than exit: this runs in pipeline workers, and main() does the exiting
+            raise Exception(f"Command failed: {stderr}")
         
-        return result.stdout + result.stderr
+        return stdout + stderr
     
     @classmethod
+    async def run_cmd_async(cls, cmd: List[str], quiet: bool = False, timeout: Optional[float] = None,
+                            duration: Optional[float] = None, offset: float = 0.0) -> str:
+        """Execute command without blocking the event loop"""
+        if not quiet:
+            print(f"▶️ {' '.join(cmd)}")
+        
+        cmd, on_line = cls.with_progress(cmd, "pipe:1", duration, offset)
+        returncode, stdout, stderr = await cls.ASYNC_RUNNER.run(cmd, timeout, on_line=on_line)
+        if returncode != 0 and not quiet:
+            # Raise rather than exit, so the event loop can cancel and clean up sibling tasks
+            raise Exception(f"Command failed: {stderr}")
+        
+        return stdout + stderr
+    
+    STEREO_FILTER = "extrastereo=m=2.5,haas=level_in=1:level_out=1:side_gain=0.8,volume=0.7"
+    ENCODE_ARGS = ["-acodec", "mp3", "-ab", "192k", "-ar", "44100"]
+    SEEK_STRATEGIES = ("auto", "input", "hybrid", "output")
+    # Audio decoded before the start point in hybrid mode (seconds)
+    SEEK_PREROLL = 30.0
+    
+    @classmethod
+    @StageTimer.timed("enhance")
     def enhance_stereo(cls, audio_path: str):
         """Enhance stereo audio"""
         temp_path = f"{audio_path}.temp"
-        filter_chain = "extrastereo=m=2.5,haas=level_in=1:level_out=1:side_gain=0.8,volume=0.7"
         
-        cmd = ["ffmpeg", "-i", audio_path, "-af", filter_chain, 
-               "-ac", "2", "-ar", "44100", "-b:a", "192k", "-y", temp_path]
+        cmd = ["ffmpeg", "-i", audio_path, "-af", cls.STEREO_FILTER, 
+               "-ac", "2", "-ar", "44100", "-b:a", "192k", "-f", "mp3", "-y", temp_path]
         
         cls.run_cmd(cmd)
         os.replace(temp_path, audio_path)
         print("✅ Stereo enhancement completed")
     
     @classmethod
-    def convert_to_mp3(cls, input_path: str, output_path: str, enhance: bool = False, 
-                      start_time: str = None, end_time: str = None):
-        """Convert to MP3"""
-        if Path(input_path).suffix.lower() == '.mp3' and not start_time and not end_time:
-            shutil.copy2(input_path, output_path)
+    def plan_seek(cls, start_time: str = None, end_time: str = None,
+                  strategy: str = "auto") -> Dict[str, object]:
+        """Choose where ffmpeg seeks: before -i (skip decoding) or after it (decode from 0)"""
+        start = SubtitleProcessor.parse_time(start_time) if start_time else 0.0
+        end = SubtitleProcessor.parse_time(end_time) if end_time else None
+        if end is not None and end <= start:
+            raise ValueError(f"End time {end_time} must be after start time {start_time or '0:00'}")
+        
+        input_args, output_args = [], []
+        if not start:
+            strategy = "none"
+        elif strategy == "output":
+            output_args = ["-ss", f"{start:.3f}"]
+        elif strategy == "hybrid":
+            # Fast seek to just before the start, then decode the preroll and drop it
+            coarse = max(0.0, start - cls.SEEK_PREROLL)
+            input_args = ["-ss", f"{coarse:.3f}"]
+            output_args = ["-ss", f"{start - coarse:.3f}"]
         else:
-            cmd = ["ffmpeg", "-i", input_path, "-vn", "-acodec", "mp3", 
-                   "-ab", "192k", "-ar", "44100"]
-            
-            # Add time range if specified
-            if start_time:
-                cmd.extend(["-ss", start_time])
-            if end_time:
-                cmd.extend(["-to", end_time])
-            
+            # Input seeking is sample-accurate when transcoding (ffmpeg's -accurate_seek)
+            strategy = "input"
+            input_args = ["-ss", f"{start:.3f}"]
+        
+        if end is not None:
+            # Timestamps restart at 0 after an input seek, so the end is given as a duration
+            if strategy == "output":
+                output_args.extend(["-to", f"{end:.3f}"])
+            else:
+                output_args.extend(["-t", f"{end - start:.3f}"])
+        
+        return {"strategy": strategy, "input_args": input_args, "output_args": output_args}
+    
+    @classmethod
+    def run_piped(cls, cmd: List[str], consume: Callable[[IO[bytes]], None],
+                  duration: Optional[float] = None, offset: float = 0.0, label: str = None):
+        """Execute command, passing its stdout stream to consume"""
+        print(f"▶️ {' '.join(cmd)}")
+        
+        # stdout carries the audio, so progress goes to stderr
+        cmd, on_line = cls.with_progress(cmd, "pipe:2", duration, offset, label)
+        with cls.ENCODE_SLOTS:
+            returncode, _, stderr = ProcessRunner.run(cmd, on_line=on_line, consume=consume)
+        
+        if returncode != 0:
+            raise Exception(f"Command failed: {stderr}")
+    
+    @classmethod
+    @StageTimer.timed("convert")
+    def convert_to_mp3(cls, input_path: str, output_path: str, enhance: bool = False, 
+                      start_time: str = None, end_time: str = None, seek: str = "auto",
+                      lrc_path: str = None, mp3_index: Dict[str, object] = None):
+        """Convert to MP3 (with lrc_path, the lyrics are embedded in the same write)
+
+        mp3_index is Mp3Cutter.load_index(input_path), when several ranges are cut from one MP3.
+        """
+        lrc_text = None
+        if lrc_path:
+            with open(lrc_path, 'r', encoding='utf-8') as f:
+                lrc_text = f.read()
+        
+        if Path(input_path).suffix.lower() == '.mp3' and not enhance:
+            if not start_time and not end_time:
+                if lrc_path:
+                    LyricsEmbedder.write_with_lyrics(input_path, output_path, lrc_path)
+                else:
+                    with StageTimer.measure("copy"):
+                        shutil.copy2(input_path, output_path)
+                return
+            # Trim by copying whole frames; re-encode only if that is not precise enough
+            if Mp3Cutter.cut(input_path, output_path, start_time, end_time, lrc_text, mp3_index):
+                return
+        
+        # Seek, stereo enhancement, resampling and encoding in a single ffmpeg graph
+        plan = cls.plan_seek(start_time, end_time, seek)
+        if plan["strategy"] != "none":
+            print(f"⏩ Seek strategy: {plan['strategy']}")
+        cmd = ["ffmpeg", *plan["input_args"], "-i", input_path, "-vn", *plan["output_args"]]
+        start = SubtitleProcessor.parse_time(start_time) if start_time else 0.0
+        duration = SubtitleProcessor.parse_time(end_time) - start if end_time else None
+        
+        if enhance:
+            cmd.extend(["-af", cls.STEREO_FILTER, "-ac", "2"])
+        
+        cmd.extend(cls.ENCODE_ARGS)
+        
+        if lrc_text is None:
             cmd.extend(["-y", output_path])
-            cls.run_cmd(cmd)
+            cls.run_cmd(cmd, duration=duration, offset=start)
+        else:
+            # Encode to a pipe and prepend the lyrics tag to the stream as it is written
+            # (ffmpeg only writes the Xing/LAME info frame to seekable outputs, so gapless
+            # info is lost; duration and seeking stay exact because ENCODE_ARGS is CBR)
+            cmd.extend(["-id3v2_version", "3", "-f", "mp3", "pipe:1"])
+            temp_path = f"{output_path}.part"
+            try:
+                with open(temp_path, 'wb') as out:
+                    def consume(stream):
+                        if not LyricsEmbedder.stream_with_lyrics(stream, out, lrc_text):
+                            raise IOError("Unsupported ID3 tag in ffmpeg output")
+                    cls.run_piped(cmd, consume, duration, start, label=output_path)
+            except BaseException:
+                Path(temp_path).unlink(missing_ok=True)
+                raise
+            os.replace(temp_path, output_path)
         
         if enhance:
-            cls.enhance_stereo(output_path)
+            print("✅ Stereo enhancement completed")
+
+    @classmethod
+    @StageTimer.timed("convert")
+    def extract_segments(cls, input_path: str, segments: List[Tuple[Optional[str], Optional[str], str]],
+                         enhance: bool = False, seek: str = "auto"):
+        """Encode several (start, end, output_path) segments with a single ffmpeg invocation"""
+        # One seeked input per segment, so each output only decodes its own range
+        inputs, outputs = [], []
+        for i, (start_time, end_time, output_path) in enumerate(segments):
+            plan = cls.plan_seek(start_time, end_time, seek)
+            inputs.extend([*plan["input_args"], "-i", input_path])
+            outputs.extend(["-map", f"{i}:a:0", *plan["output_args"]])
+            if enhance:
+                outputs.extend(["-af", cls.STEREO_FILTER, "-ac", "2"])
+            outputs.extend([*cls.ENCODE_ARGS, "-y", output_path])
+        
+        # Outputs are encoded side by side, so the longest one sets the total
+        lengths = [SubtitleProcessor.parse_time(e) - (SubtitleProcessor.parse_time(s) if s else 0.0)
+                   for s, e, _ in segments if e]
+        duration = max(lengths) if len(lengths) == len(segments) else None
+        cls.run_cmd(["ffmpeg", *inputs, *outputs], duration=duration)
+        print(f"✅ Extracted {len(segments)} segments")
 
 class YouTubeDownloader:
     """YouTube downloader"""
     
+    # Concurrent yt-dlp children when driven from asyncio (mostly waiting on the network)
+    ASYNC_RUNNER = AsyncProcessRunner(32)
+    
     @staticmethod
-    def run_cmd(cmd: List[str]) -> str:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"Command failed: {result.stderr}")
-        return result.stdout.strip()
+    def run_cmd(cmd: List[str], keep_stdout: bool = True) -> str:
+        returncode, stdout, stderr = ProcessRunner.run(cmd, keep_stdout)
+        if returncode != 0:
+            raise Exception(f"Command failed: {stderr}")
+        return stdout.strip()
+    
+    @classmethod
+    async def run_cmd_async(cls, cmd: List[str], timeout: Optional[float] = None,
+                            keep_stdout: bool = True) -> str:
+        returncode, stdout, stderr = await cls.ASYNC_RUNNER.run(cmd, timeout, keep_stdout)
+        if returncode != 0:
+            raise Exception(f"Command failed: {stderr}")
+        return stdout.strip()
+    
+    @classmethod
+    def get_metadata(cls, url: str) -> Dict[str, object]:
+        """Get video metadata and chapter markers"""
+        output = cls.run_cmd(["yt-dlp", "--print", "id", "--print", "title", "--print", "duration",
+                              "--print", "%(chapters)j", url])
+        video_id, title, duration, chapters = (output.splitlines() + ["", "", "", ""])[:4]
+        try:
+            duration = float(duration)
+        except ValueError:
+            duration = None  # "NA" for live streams
+        try:
+            chapters = json.loads(chapters)
+        except ValueError:
+            chapters = None  # "NA" when the video has no chapters
+        return {"id": video_id, "title": cls.sanitize_title(title), "duration": duration,
+                "chapters": cls.normalize_chapters(chapters)}
+    
+    VIDEO_ID = r'[A-Za-z0-9_-]{11}'
+    URL_PATTERNS = [
+        re.compile(rf'^({VIDEO_ID})$'),
+        re.compile(rf'^(?:https?://)?(?:www\.|m\.|music\.)?youtube\.com/watch\?(?:.*&)?v=({VIDEO_ID})(?:[&#]|$)'),
+        re.compile(rf'^(?:https?://)?(?:www\.|m\.|music\.)?youtube\.com/(?:shorts|embed|live|v)/({VIDEO_ID})(?:[/?&#]|$)'),
+        re.compile(rf'^(?:https?://)?youtu\.be/({VIDEO_ID})(?:[/?&#]|$)'),
+    ]
     
     @classmethod
-    def get_metadata(cls, url: str) -> Dict[str, str]:
-        """Get video metadata"""
-        title = cls.run_cmd(["yt-dlp", "--get-title", url])
-        video_id = cls.run_cmd(["yt-dlp", "--get-id", url])
-        title = re.sub(r'[\\/*?:"<>|]', '_', title)
-        return {"id": video_id, "title": title}
+    def parse_video_id(cls, url: str) -> Optional[str]:
+        """Extract the video id from a YouTube URL without any network access"""
+        for pattern in cls.URL_PATTERNS:
+            match = pattern.match(url.strip())
+            if match:
+                return match.group(1)
+        return None
+    
+    @staticmethod
+    def sanitize_title(title: str) -> str:
+        """Make title safe for use in filenames"""
+        return re.sub(r'[\\/*?:"<>|]', '_', title)
+    
+    @staticmethod
+    def normalize_chapters(chapters: Optional[List[dict]]) -> List[Dict[str, object]]:
+        """Convert yt-dlp chapter dicts to {start, end, title}"""
+        return [{"start": float(c["start_time"]), "end": float(c["end_time"]),
+                 "title": YouTubeDownloader.sanitize_title(c.get("title") or f"Chapter {i}")}
+                for i, c in enumerate(chapters or [], 1)]
     
     @classmethod
+    @StageTimer.timed("subtitles")
     def get_subtitles(cls, url: str) -> Tuple[Dict[str, str], Dict[str, str]]:
         """Get available subtitles"""
         output = cls.run_cmd(["yt-dlp", "--list-subs", url])
@@ -197,21 +1072,23 @@ class YouTubeDownloader:
         return manual_subs, auto_subs
     
     @classmethod
-    def download(cls, url: str, output_dir: Path, video_id: str, lang: str, 
-                start_time: str = None, end_time: str = None) -> bool:
-        """Download audio and subtitles"""
-        template = str(output_dir / f"{video_id}.%(ext)s")
+    def download(cls, url: str, output_dir: Path, basename: str, lang: str, 
+                start_time: str = None, end_time: str = None,
+                subtitles: Tuple[Dict[str, str], Dict[str, str]] = None) -> Optional[Path]:
+        """Download the audio stream as served (no transcode) and subtitles; returns the audio path"""
+        template = str(output_dir / f"{basename}.source.%(ext)s")
+        subtitle_template = str(output_dir / f"{basename}.%(ext)s")
         
         # Check subtitle availability
-        manual_subs, auto_subs = cls.get_subtitles(url)
+        manual_subs, auto_subs = subtitles or cls.get_subtitles(url)
         use_auto = lang not in manual_subs
         
         if lang not in manual_subs and lang not in auto_subs:
             print(f"❌ Cannot find subtitles for language '{lang}'")
-            return False
+            return None
         
         # Build download command
-        cmd = ["yt-dlp", "-x", "--audio-format", "mp3"]
+        cmd = ["yt-dlp", "-f", "bestaudio/best"]
         
         if use_auto:
             cmd.extend(["--write-auto-sub", "--sub-lang", lang, "--sub-format", "srt"])
@@ -220,24 +1097,349 @@ class YouTubeDownloader:
             cmd.extend(["--write-sub", "--sub-lang", lang, "--sub-format", "srt"])
             print(f"✅ Using manual subtitles: {lang}")
         
-        if start_time and end_time:
-            cmd.extend(["--download-sections", f"*{start_time}-{end_time}"])
+        if start_time or end_time:
+            cmd.extend(["--download-sections", f"*{start_time or '0'}-{end_time or 'inf'}"])
         
-        cmd.extend(["-o", template, url])
+        # --print implies --quiet, so stdout only carries the final audio path
+        cmd.extend(["-o", template, "-o", f"subtitle:{subtitle_template}",
+                    "--print", "after_move:filepath", url])
         
         try:
-            cls.run_cmd(cmd)
-            return True
+            lines = cls.run_cmd(cmd).splitlines()
         except Exception as e:
             print(f"❌ Download failed: {e}")
+            return None
+        if not lines or not Path(lines[-1]).exists():
+            print("❌ Download failed: yt-dlp did not report an audio file")
+            return None
+        return Path(lines[-1])
+
+class YtDlpApiDownloader:
+    """In-process yt-dlp downloader (one extraction per URL)"""
+    
+    SUB_FORMATS = ('vtt', 'srt', 'ttml')
+    
+    def __init__(self):
+        self._info = {}
+    
+    @staticmethod
+    def available() -> bool:
+        """Check whether the yt_dlp package can be imported"""
+        try:
+            import yt_dlp  # noqa: F401
+            return True
+        except ImportError:
             return False
+    
+    def extract_info(self, url: str) -> dict:
+        """Extract video info once and reuse it for every later call"""
+        if url not in self._info:
+            import yt_dlp
+            params = {"quiet": True, "no_warnings": True, "skip_download": True}
+            with yt_dlp.YoutubeDL(params) as ydl:
+                self._info[url] = ydl.extract_info(url, download=False)
+        return self._info[url]
+    
+    def get_metadata(self, url: str) -> Dict[str, object]:
+        """Get video metadata and chapter markers"""
+        info = self.extract_info(url)
+        title = YouTubeDownloader.sanitize_title(info.get('title') or info['id'])
+        return {"id": info['id'], "title": title, "duration": info.get('duration'),
+                "chapters": YouTubeDownloader.normalize_chapters(info.get('chapters'))}
+    
+    @StageTimer.timed("subtitles")
+    def get_subtitles(self, url: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Get available subtitles"""
+        info = self.extract_info(url)
+        
+        def collect(tracks_by_lang: Optional[dict]) -> Dict[str, str]:
+            subs = {}
+            for lang_code, tracks in (tracks_by_lang or {}).items():
+                # Same filter as `--list-subs` parsing: only text subtitle formats
+                if any(t.get('ext') in self.SUB_FORMATS for t in tracks):
+                    subs[lang_code] = (tracks[0].get('name') or lang_code).strip()
+            return subs
+        
+        return collect(info.get('subtitles')), collect(info.get('automatic_captions'))
+    
+    def download(self, url: str, output_dir: Path, basename: str, lang: str,
+                start_time: str = None, end_time: str = None,
+                subtitles: Tuple[Dict[str, str], Dict[str, str]] = None) -> Optional[Path]:
+        """Download the audio stream as served (no transcode) and subtitles; returns the audio path"""
+        import yt_dlp
+        from yt_dlp.utils import download_range_func
+        
+        template = str(output_dir / f"{basename}.source.%(ext)s")
+        subtitle_template = str(output_dir / f"{basename}.%(ext)s")
+        
+        # Check subtitle availability
+        manual_subs, auto_subs = subtitles or self.get_subtitles(url)
+        use_auto = lang not in manual_subs
+        
+        if lang not in manual_subs and lang not in auto_subs:
+            print(f"❌ Cannot find subtitles for language '{lang}'")
+            return None
+        
+        # Same options the CLI engine passes on the command line
+        params = {
+            "format": "bestaudio/best",
+            "outtmpl": {"default": template, "subtitle": subtitle_template},
+            "quiet": True,
+            "no_warnings": True,
+            "noprogress": True,
+            "writesubtitles": not use_auto,
+            "writeautomaticsub": use_auto,
+            "subtitleslangs": [lang],
+            "subtitlesformat": "srt",
+        }
+        
+        if use_auto:
+            print(f"⚠️ Using auto-generated subtitles: {lang}")
+        else:
+            print(f"✅ Using manual subtitles: {lang}")
+        
+        if start_time or end_time:
+            section = (SubtitleProcessor.parse_time(start_time) if start_time else 0,
+                       SubtitleProcessor.parse_time(end_time) if end_time else math.inf)
+            params["download_ranges"] = download_range_func(None, [section])
+        
+        try:
+            with yt_dlp.YoutubeDL(params) as ydl:
+                # Re-process the probed info like `--load-info-json` does, without re-extracting
+                info = ydl.sanitize_info(self.extract_info(url), remove_private_keys=True)
+                info = ydl.process_ie_result(info, download=True)
+        except Exception as e:
+            print(f"❌ Download failed: {e}")
+            return None
+        
+        downloads = info.get("requested_downloads") or [{}]
+        path = downloads[-1].get("filepath")
+        if not path or not Path(path).exists():
+            print("❌ Download failed: yt-dlp did not report an audio file")
+            return None
+        return Path(path)
 
-class LyricsEmbedder:
-    """Lyrics embedder"""
+def get_downloader(engine: str):
+    """Select the yt-dlp engine ('api', 'cli' or 'auto')"""
+    if engine == "cli":
+        return YouTubeDownloader
+    if engine == "api" or YtDlpApiDownloader.available():
+        return YtDlpApiDownloader()
+    return YouTubeDownloader
+
+class ProbeCache:
+    """On-disk (SQLite) cache of video metadata, chapters and subtitle listings per URL"""
+    
+    # Missing subtitle languages are re-checked sooner, since auto captions appear later
+    NEGATIVE_TTL = 3600
+    # Query parameters that do not change which video a URL points to
+    IGNORED_PARAMS = {"si", "feature", "pp", "t", "start", "ab_channel"}
+    
+    def __init__(self, path: Path, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        with closing(self.connect()) as conn, conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS probes (
+                url TEXT PRIMARY KEY, video_id TEXT, title TEXT, duration REAL, chapters TEXT,
+                manual_subs TEXT, auto_subs TEXT, fetched_at REAL NOT NULL)""")
+    
+    def connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps the cache safe to use from worker threads
+        return sqlite3.connect(str(self.path), timeout=30)
+    
+    @classmethod
+    def normalize_url(cls, url: str) -> str:
+        """Canonical form of a URL for use as a cache key"""
+        video_id = YouTubeDownloader.parse_video_id(url)
+        if video_id:
+            return f"https://www.youtube.com/watch?v={video_id}"
+        
+        parts = urlsplit(url.strip())
+        host = parts.netloc.lower()
+        for prefix in ("www.", "m."):
+            if host.startswith(prefix):
+                host = host[len(prefix):]
+        query = sorted((k, v) for k, v in parse_qsl(parts.query) if k not in cls.IGNORED_PARAMS)
+        return urlunsplit(("https", host, parts.path.rstrip('/'), urlencode(query), ""))
+    
+    def lookup(self, url: str) -> Optional[Dict[str, object]]:
+        """Cached probe for url, or None if missing or expired"""
+        with closing(self.connect()) as conn:
+            row = conn.execute("SELECT video_id, title, duration, chapters, manual_subs, auto_subs, fetched_at "
+                               "FROM probes WHERE url = ?", (self.normalize_url(url),)).fetchone()
+        if not row or time.time() - row[6] > self.ttl:
+            return None
+        return {"id": row[0], "title": row[1], "duration": row[2], "chapters": json.loads(row[3]),
+                "subtitles": (json.loads(row[4]), json.loads(row[5])) if row[4] is not None else None,
+                "age": time.time() - row[6]}
+    
+    def store(self, url: str, metadata: Dict[str, object],
+              subtitles: Tuple[Dict[str, str], Dict[str, str]] = None):
+        """Record a probe result"""
+        manual, auto = (json.dumps(subtitles[0]), json.dumps(subtitles[1])) if subtitles else (None, None)
+        with closing(self.connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (self.normalize_url(url), metadata["id"], metadata["title"], metadata.get("duration"),
+                          json.dumps(metadata.get("chapters") or []), manual, auto, time.time()))
+
+class CachedDownloader:
+    """Downloader wrapper that answers metadata and subtitle probes from a ProbeCache"""
+    
+    def __init__(self, downloader, cache: ProbeCache):
+        self.downloader = downloader
+        self.cache = cache
+    
+    def get_metadata(self, url: str) -> Dict[str, object]:
+        """Get video metadata and chapter markers"""
+        cached = self.cache.lookup(url)
+        if cached:
+            return {k: cached[k] for k in ("id", "title", "duration", "chapters")}
+        metadata = self.downloader.get_metadata(url)
+        self.cache.store(url, metadata)
+        return metadata
+    
+    def get_subtitles(self, url: str, lang: str = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Get available subtitles (a cached 'lang not available' expires after NEGATIVE_TTL)"""
+        cached = self.cache.lookup(url)
+        if cached and cached["subtitles"] is not None:
+            manual_subs, auto_subs = cached["subtitles"]
+            if lang is None or lang in manual_subs or lang in auto_subs or \
+                    cached["age"] < self.cache.NEGATIVE_TTL:
+                return manual_subs, auto_subs
+        
+        subtitles = self.downloader.get_subtitles(url)
+        metadata = cached or self.downloader.get_metadata(url)
+        self.cache.store(url, metadata, subtitles)
+        return subtitles
+    
+    def download(self, url: str, output_dir: Path, basename: str, lang: str,
+                 start_time: str = None, end_time: str = None) -> Optional[Path]:
+        """Download the audio stream and subtitles; returns the audio path"""
+        return self.downloader.download(url, output_dir, basename, lang, start_time, end_time,
+                                        self.get_subtitles(url, lang))
+
+class Id3Tag:
+    """Minimal ID3v2 reader and ID3v2.3 writer"""
+    
+    PADDING = 1024
+    # Text encodings that only exist in ID3v2.4
+    V24_ENCODINGS = {2: 'utf-16-be', 3: 'utf-8'}
+    # Non-text frames whose payload starts with a text encoding byte
+    ENCODED_FRAMES = {'WXXX', 'APIC', 'GEOB', 'SYLT', 'USER', 'OWNE', 'COMR', 'IPLS'}
     
     @staticmethod
-    def embed_lyrics(mp3_path: str, lrc_path: str):
-        """Embed LRC lyrics into MP3"""
+    def syncsafe(data: bytes) -> int:
+        """Decode a 4-byte syncsafe integer"""
+        return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+    
+    @staticmethod
+    def utf16(text: str) -> bytes:
+        """Encode text as BOM-prefixed UTF-16"""
+        return b'\xff\xfe' + text.encode('utf-16-le')
+    
+    @classmethod
+    def tag_size(cls, header: bytes) -> int:
+        """Total size of the ID3v2 tag starting with header (0 if there is none)"""
+        if len(header) < 10 or header[0:3] != b'ID3':
+            return 0
+        return 10 + cls.syncsafe(header[6:10]) + (10 if header[5] & 0x10 else 0)
+    
+    @classmethod
+    def parse_frames(cls, tag: bytes) -> Optional[List[Tuple[str, bytes]]]:
+        """Parse a v2.3/v2.4 tag into ID3v2.3 (frame_id, payload) pairs
+
+        Returns None if any frame cannot be carried over unchanged, so callers fall back to
+        a full ID3 library instead of dropping data (cover art, links, ...).
+        """
+        major, flags = tag[3], tag[5]
+        # Tag-level unsynchronisation and extended headers are not handled
+        if major not in (3, 4) or flags & 0xC0:
+            return None
+        
+        frames = []
+        pos, end = 10, 10 + cls.syncsafe(tag[6:10])
+        while pos + 10 <= end and tag[pos] != 0:
+            frame_id = tag[pos:pos + 4].decode('latin-1')
+            size_bytes = tag[pos + 4:pos + 8]
+            size = cls.syncsafe(size_bytes) if major == 4 else int.from_bytes(size_bytes, 'big')
+            format_flags = tag[pos + 9]
+            payload = tag[pos + 10:pos + 10 + size]
+            pos += 10 + size
+            
+            # Grouping, compression, encryption and unsynchronisation are not handled
+            if format_flags:
+                return None
+            if major == 4 and payload and payload[0] in cls.V24_ENCODINGS:
+                if frame_id.startswith('T') or frame_id in ('COMM', 'USLT'):
+                    payload = cls.convert_text_frame(frame_id, payload)
+                elif frame_id in cls.ENCODED_FRAMES:
+                    return None
+            frames.append((frame_id, payload))
+        return frames
+    
+    @classmethod
+    def convert_text_frame(cls, frame_id: str, payload: bytes) -> bytes:
+        """Re-encode a v2.4 UTF-8/UTF-16BE text frame as v2.3 UTF-16"""
+        encoding = cls.V24_ENCODINGS[payload[0]]
+        if frame_id in ('COMM', 'USLT'):
+            desc, _, text = payload[4:].decode(encoding, 'replace').partition('\0')
+            return b'\x01' + payload[1:4] + cls.utf16(desc) + b'\0\0' + cls.utf16(text.rstrip('\0'))
+        
+        values = payload[1:].decode(encoding, 'replace').rstrip('\0').split('\0')
+        if frame_id == 'TXXX':
+            return b'\x01' + cls.utf16(values[0]) + b'\0\0' + cls.utf16('/'.join(values[1:]))
+        # v2.4 multi-value separators become the v2.3 '/' convention
+        return b'\x01' + cls.utf16('/'.join(values))
+    
+    @classmethod
+    def lyrics_frame(cls, lrc_text: str, lang: bytes = b'eng', description: str = '') -> Tuple[str, bytes]:
+        """Build a USLT frame"""
+        return 'USLT', b'\x01' + lang + cls.utf16(description) + b'\0\0' + cls.utf16(lrc_text)
+    
+    @staticmethod
+    def is_default_lyrics(frame_id: str, payload: bytes) -> bool:
+        """Check for a USLT frame with an empty description"""
+        if frame_id != 'USLT' or len(payload) < 5:
+            return False
+        desc = payload[4:]
+        if payload[0] in (1, 2):
+            return desc[:2] == b'\0\0' or desc[:4] in (b'\xff\xfe\0\0', b'\xfe\xff\0\0')
+        return desc[:1] == b'\0'
+    
+    @classmethod
+    def render(cls, frames: List[Tuple[str, bytes]], padding: int = None) -> bytes:
+        """Render frames as an ID3v2.3 tag"""
+        body = b''.join(frame_id.encode('latin-1') + len(payload).to_bytes(4, 'big') + b'\0\0' + payload
+                        for frame_id, payload in frames)
+        body += b'\0' * (cls.PADDING if padding is None else padding)
+        size = len(body)
+        syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+        return b'ID3\x03\x00\x00' + syncsafe + body
+
+class TagBackend:
+    """Lyrics tag writer interface"""
+    
+    name = None
+    module = None
+    
+    @classmethod
+    def available(cls) -> bool:
+        """Check whether the backend's library can be imported"""
+        return cls.module is None or importlib.util.find_spec(cls.module) is not None
+    
+    def embed(self, mp3_path: str, lrc_text: str):
+        """Embed LRC lyrics into the MP3 file in place"""
+        raise NotImplementedError
+
+class Eyed3Backend(TagBackend):
+    """Tag writer based on eyed3"""
+    
+    name = "eyed3"
+    module = "eyed3"
+    
+    def embed(self, mp3_path: str, lrc_text: str):
+        import eyed3
+        
         audiofile = eyed3.load(mp3_path)
         if not audiofile:
             raise IOError("Cannot load MP3 file")
@@ -245,13 +1447,416 @@ class LyricsEmbedder:
         if not audiofile.tag:
             audiofile.initTag(version=eyed3.id3.ID3_V2_3)
         
-        with open(lrc_path, 'r', encoding='utf-8') as f:
-            lrc_text = f.read()
-        
         audiofile.tag.lyrics.remove('')
         audiofile.tag.lyrics.set(lrc_text)
         audiofile.tag.save(version=eyed3.id3.ID3_V2_3, encoding='utf-8')
 
+class MutagenBackend(TagBackend):
+    """Tag writer based on mutagen"""
+    
+    name = "mutagen"
+    module = "mutagen"
+    
+    def embed(self, mp3_path: str, lrc_text: str):
+        from mutagen.id3 import ID3, USLT, ID3NoHeaderError
+        
+        try:
+            tags = ID3(mp3_path)
+        except ID3NoHeaderError:
+            tags = ID3()
+        
+        tags.delall('USLT::eng')
+        tags.add(USLT(encoding=1, lang='eng', desc='', text=lrc_text))
+        tags.save(mp3_path, v2_version=3)
+
+class BuiltinBackend(TagBackend):
+    """Minimal built-in ID3v2.3 USLT writer"""
+    
+    name = "builtin"
+    
+    def embed(self, mp3_path: str, lrc_text: str):
+        with open(mp3_path, 'rb') as f:
+            head = f.read(10)
+            tag_size = Id3Tag.tag_size(head)
+            tag = head + f.read(tag_size - 10) if tag_size else b''
+        
+        new_tag = LyricsEmbedder.lyrics_tag(tag, lrc_text, padding=0)
+        if new_tag is None:
+            raise IOError("Unsupported ID3 tag")
+        
+        if tag_size and len(new_tag) <= tag_size:
+            # Fits in the existing tag and its padding: overwrite in place
+            new_tag = LyricsEmbedder.lyrics_tag(tag, lrc_text, padding=tag_size - len(new_tag))
+            with open(mp3_path, 'r+b') as f:
+                f.write(new_tag)
+            return
+        
+        temp_path = f"{mp3_path}.part"
+        with open(mp3_path, 'rb') as src, open(temp_path, 'wb') as out:
+            LyricsEmbedder.stream_with_lyrics(src, out, lrc_text)
+        os.replace(temp_path, mp3_path)
+
+TAG_BACKENDS = {backend.name: backend for backend in (Eyed3Backend, MutagenBackend, BuiltinBackend)}
+
+class LyricsEmbedder:
+    """Lyrics embedder"""
+    
+    @staticmethod
+    @StageTimer.timed("embed")
+    def embed_lyrics(mp3_path: str, lrc_path: str, backend: str = "builtin"):
+        """Embed LRC lyrics into MP3"""
+        with open(lrc_path, 'r', encoding='utf-8') as f:
+            lrc_text = f.read()
+        
+        TAG_BACKENDS[backend]().embed(mp3_path, lrc_text)
+    
+    @classmethod
+    @StageTimer.timed("embed")
+    def write_with_lyrics(cls, source_mp3: str, dest_mp3: str, lrc_path: str,
+                          backend: str = "builtin"):
+        """Write MP3 with embedded lyrics to dest_mp3 in a single sequential pass"""
+        if backend == "builtin":
+            with open(lrc_path, 'r', encoding='utf-8') as f:
+                lrc_text = f.read()
+            
+            # Write next to the destination and rename, so a crash never leaves a partial file
+            temp_path = f"{dest_mp3}.part"
+            with open(source_mp3, 'rb') as src, open(temp_path, 'wb') as out:
+                streamed = cls.stream_with_lyrics(src, out, lrc_text)
+            
+            if streamed:
+                os.replace(temp_path, dest_mp3)
+                return
+            
+            # Tag layout we cannot carry over: copy, then let a full ID3 library rewrite it
+            os.unlink(temp_path)
+            backend = next((b.name for b in (Eyed3Backend, MutagenBackend) if b.available()), None)
+            if backend is None:
+                raise IOError("Unsupported ID3 tag and neither eyed3 nor mutagen is installed")
+        
+        shutil.copy2(source_mp3, dest_mp3)
+        cls.embed_lyrics(str(dest_mp3), lrc_path, backend)
+    
+    @staticmethod
+    def lyrics_tag(tag: bytes, lrc_text: str, padding: int = None) -> Optional[bytes]:
+        """Render an existing ID3v2 tag (or none) as ID3v2.3 with lyrics; None if unsupported"""
+        frames = Id3Tag.parse_frames(tag) if tag else []
+        if frames is None:
+            return None
+        frames = [f for f in frames if not Id3Tag.is_default_lyrics(*f)]
+        frames.append(Id3Tag.lyrics_frame(lrc_text))
+        return Id3Tag.render(frames, padding)
+    
+    @classmethod
+    def stream_with_lyrics(cls, src, out, lrc_text: str) -> bool:
+        """Stream a new tag plus the source audio frames into out; False if unsupported"""
+        head = src.read(10)
+        tag_size = Id3Tag.tag_size(head)
+        tag = head + src.read(tag_size - 10) if tag_size else b''
+        
+        new_tag = cls.lyrics_tag(tag, lrc_text)
+        if new_tag is None:
+            return False
+        
+        out.write(new_tag)
+        if not tag_size:
+            out.write(head)
+        shutil.copyfileobj(src, out, 1 << 20)
+        return True
+
+class SourceCache:
+    """Source artifacts keyed by video id and every option that changes their content"""
+    
+    ARTIFACTS = ("mp3", "srt", "lrc")
+    
+    def __init__(self, source_dir: Path):
+        self.source_dir = source_dir
+    
+    def entry(self, video_id: str, start_time: Optional[str], end_time: Optional[str],
+              lang: str, enhance: bool) -> Dict[str, Path]:
+        """Paths of the cached artifacts for one (video, range, language, options) combination"""
+        # Normalized so that e.g. 1:00 and 00:01:00 share an entry
+        spec = {"id": video_id, "lang": lang, "enhance": bool(enhance),
+                "start": SubtitleProcessor.parse_time(start_time) if start_time else None,
+                "end": SubtitleProcessor.parse_time(end_time) if end_time else None}
+        key = hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        stem = f"{video_id}.{key}"
+        return {"stem": stem, "spec": spec,
+                "mp3": self.source_dir / f"{stem}.mp3",
+                "srt": self.source_dir / f"{stem}.{lang}.srt",
+                "lrc": self.source_dir / f"{stem}.lrc",
+                "meta": self.source_dir / f"{stem}.json"}
+    
+    @staticmethod
+    def file_hash(path: Path) -> str:
+        """SHA-256 of a file's content"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def read_meta(self, entry: Dict[str, Path]) -> Dict[str, dict]:
+        """Load the entry's record (empty if missing or for different options)"""
+        try:
+            with open(entry["meta"], 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return meta if meta.get("spec") == entry["spec"] else {}
+    
+    def is_valid(self, entry: Dict[str, Path], names: Tuple[str, ...]) -> bool:
+        """Check that the artifacts exist and still match their recorded content hashes"""
+        meta = self.read_meta(entry)
+        for name in names:
+            record = meta.get("files", {}).get(name)
+            try:
+                stat = entry[name].stat()
+            except OSError:
+                return False
+            if not record or stat.st_size != record["size"]:
+                return False
+            # Only re-hash when the file was touched since it was recorded
+            if stat.st_mtime_ns != record["mtime_ns"] and self.file_hash(entry[name]) != record["sha256"]:
+                return False
+        return True
+    
+    def commit(self, entry: Dict[str, Path], names: Tuple[str, ...]):
+        """Record the artifacts' content hashes, making them cache hits"""
+        meta = self.read_meta(entry) or {"spec": entry["spec"], "files": {}}
+        for name in names:
+            stat = entry[name].stat()
+            meta["files"][name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                   "sha256": self.file_hash(entry[name])}
+        self.write_meta(entry, meta)
+    
+    @staticmethod
+    def write_meta(entry: Dict[str, Path], meta: Dict[str, dict]):
+        """Atomically replace the entry's record"""
+        temp_path = f"{entry['meta']}.part"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(temp_path, entry["meta"])
+    
+    @StageTimer.timed("cleanup")
+    def remove(self, entry: Dict[str, Path], names: Tuple[str, ...] = ARTIFACTS):
+        """Delete artifacts and their record"""
+        meta = self.read_meta(entry)
+        for name in names:
+            entry[name].unlink(missing_ok=True)
+            meta.get("files", {}).pop(name, None)
+        if meta.get("files"):
+            self.write_meta(entry, meta)
+        else:
+            entry["meta"].unlink(missing_ok=True)
+
+class OutputManifest:
+    """SQLite record of produced outputs, indexed by video id and job options"""
+    
+    COLUMNS = ["path", "video_id", "job_key", "title", "start_time", "end_time", "lang",
+               "options", "size", "sha256", "elapsed", "created_at"]
+    
+    def __init__(self, path: Path):
+        self.path = path
+        with closing(self.connect()) as conn, conn:
+            # Only a new manifest needs a write; IF NOT EXISTS covers jobs racing to create it
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'outputs'").fetchone():
+                conn.execute("""CREATE TABLE IF NOT EXISTS outputs (
+                    path TEXT PRIMARY KEY, video_id TEXT NOT NULL, job_key TEXT NOT NULL,
+                    title TEXT, start_time REAL, end_time REAL, lang TEXT, options TEXT NOT NULL,
+                    size INTEGER, sha256 TEXT, elapsed REAL, created_at REAL NOT NULL)""")
+                conn.execute("CREATE INDEX IF NOT EXISTS outputs_job ON outputs (video_id, job_key)")
+    
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.path), timeout=30)
+    
+    @staticmethod
+    def seconds(t: Optional[str]) -> Optional[float]:
+        return SubtitleProcessor.parse_time(t) if t else None
+    
+    @classmethod
+    def job_options(cls, config: Config) -> Dict[str, object]:
+        """Options that determine which outputs a download job produces"""
+        return {"lang": config.lang, "enhance": bool(config.enhance_stereo),
+                "start": cls.seconds(config.start_time), "end": cls.seconds(config.end_time),
+                "segments": [[cls.seconds(s), cls.seconds(e)] for s, e in config.segments],
+                "chapters": bool(config.split_chapters)}
+    
+    @staticmethod
+    def job_key(options: Dict[str, object]) -> str:
+        return hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    
+    def completed(self, video_id: str, options: Dict[str, object]) -> Optional[List[Path]]:
+        """Outputs of a finished job, or None if it has not run or an output is gone or changed"""
+        with closing(self.connect()) as conn:
+            rows = conn.execute("SELECT path, size FROM outputs WHERE video_id = ? AND job_key = ?",
+                                (video_id, self.job_key(options))).fetchall()
+        if not rows:
+            return None
+        
+        for path, size in rows:
+            try:
+                if size is not None and os.stat(path).st_size != size:
+                    return None
+            except OSError:
+                return None
+        return [Path(path) for path, _ in rows]
+    
+    def record(self, video_id: str, title: str, options: Dict[str, object],
+               outputs: List[Tuple[Path, Optional[float], Optional[float]]], elapsed: Optional[float]):
+        """Record a finished job's outputs (path, start, end) in a single transaction"""
+        key, now = self.job_key(options), time.time()
+        rows = [(str(path), video_id, key, title, start, end, options.get("lang"),
+                 json.dumps(options, sort_keys=True), path.stat().st_size,
+                 SourceCache.file_hash(path), elapsed, now)
+                for path, start, end in outputs]
+        with closing(self.connect()) as conn, conn:
+            conn.execute("DELETE FROM outputs WHERE video_id = ? AND job_key = ?", (video_id, key))
+            conn.executemany(f"INSERT OR REPLACE INTO outputs ({', '.join(self.COLUMNS)}) "
+                             f"VALUES ({', '.join('?' * len(self.COLUMNS))})", rows)
+    
+    def owners(self, paths: List[Path]) -> Dict[Path, str]:
+        """Job keys that the given outputs are recorded under (unrecorded paths are left out)"""
+        with closing(self.connect()) as conn:
+            rows = [conn.execute("SELECT job_key FROM outputs WHERE path = ?", (str(path),)).fetchone()
+                    for path in paths]
+        return {path: row[0] for path, row in zip(paths, rows) if row}
+    
+    def entries(self, video_id: Optional[str] = None) -> List[Dict[str, object]]:
+        """Recorded outputs, optionally for one video, ordered by title"""
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM outputs"
+        params: Tuple[str, ...] = ()
+        if video_id:
+            query, params = query + " WHERE video_id = ?", (video_id,)
+        with closing(self.connect()) as conn:
+            rows = conn.execute(query + " ORDER BY title, start_time, path", params).fetchall()
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+class BatchJournal:
+    """Write-ahead log of batch item stages, used to resume interrupted runs"""
+    
+    # Stages in the order an item passes them ("fetched": raw stream downloaded, not yet encoded)
+    STAGES = ["probed", "fetched", "downloaded", "converted", "embedded", "done", "failed"]
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.items = self.load()
+    
+    def load(self) -> Dict[str, Dict[str, object]]:
+        """Replay the journal into the latest state of each item"""
+        items: Dict[str, Dict[str, object]] = {}
+        if not self.path.exists():
+            return items
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final write from a crash
+                    continue
+                items.setdefault(record.pop("key"), {}).update(record)
+        return items
+    
+    @staticmethod
+    def item_key(url: str, options: Dict[str, object]) -> str:
+        video = YouTubeDownloader.parse_video_id(url) or ProbeCache.normalize_url(url)
+        return f"{video}:{OutputManifest.job_key(options)}"
+    
+    def resume(self, key: str) -> Dict[str, object]:
+        """Last recorded state of an item (empty if it never started)"""
+        with self.lock:
+            return dict(self.items.get(key, {}))
+    
+    def stage(self, key: str, stage: str, **data):
+        """Durably record that an item reached a stage before moving on"""
+        if stage not in self.STAGES:
+            raise ValueError(f"Unknown journal stage: {stage}")
+        record = {"key": key, "stage": stage, "time": time.time(), **data}
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.items.setdefault(key, {}).update(record)
+            self.items[key].pop("key")
+    
+    def compact(self):
+        """Drop finished items; remove the journal once nothing is left to resume"""
+        with self.lock:
+            pending = {k: v for k, v in self.items.items() if v.get("stage") != "done"}
+            if not pending:
+                self.path.unlink(missing_ok=True)
+                return
+            temp_path = f"{self.path}.part"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for key, state in pending.items():
+                    f.write(json.dumps({"key": key, **state}) + "\n")
+            os.replace(temp_path, self.path)
+
+def segment_label(start_time: Optional[str], end_time: Optional[str]) -> str:
+    """Filename-safe label for a segment"""
+    return f"{start_time or '0.00'}-{end_time or 'end'}".replace(':', '.')
+
+def process_segments(config: Config, audio_path: Path, subtitle_path: Path, source_stem: str,
+                     segments: List[Tuple[Optional[str], Optional[str], str]], enhance: bool,
+                     parallel: bool = False) -> List[Path]:
+    """Cut (start, end, output_name) segments from one source into MP3s with lyrics"""
+    outputs, pending = [], []
+    for i, (start_time, end_time, output_name) in enumerate(segments):
+        final_mp3 = config.output_dir / f"{output_name}.mp3"
+        outputs.append(final_mp3)
+        if final_mp3.exists():
+            print(f"✅ File already exists: {final_mp3}")
+            continue
+        pending.append((start_time, end_time, final_mp3,
+                        config.source_dir / f"{source_stem}.{i:03d}.mp3",
+                        config.source_dir / f"{source_stem}.{i:03d}.lrc"))
+    
+    if not pending:
+        return outputs
+    
+    # One subtitle parse for all segments
+    SubtitleProcessor.srt_to_lrc_windows(str(subtitle_path),
+                                         [(s, e, str(lrc)) for s, e, _, _, lrc in pending])
+    
+    # An MP3 that needs no enhancement is cut losslessly per segment instead of re-encoded
+    lossless = audio_path.suffix.lower() == '.mp3' and not enhance
+    if parallel or lossless:
+        # Frame index for lossless cuts, built once instead of per segment
+        mp3_index = Mp3Cutter.load_index(str(audio_path)) if lossless else None
+        
+        # Independent per-segment jobs (lossless cut or input-seeked encode) across all cores
+        def cut(item):
+            start_time, end_time, final_mp3, segment_mp3, segment_lrc = item
+            if config.tag_backend == "builtin":
+                AudioProcessor.convert_to_mp3(str(audio_path), str(final_mp3), enhance, start_time,
+                                             end_time, config.seek, lrc_path=str(segment_lrc),
+                                             mp3_index=mp3_index)
+            else:
+                AudioProcessor.convert_to_mp3(str(audio_path), str(segment_mp3), enhance, start_time,
+                                             end_time, config.seek, mp3_index=mp3_index)
+                LyricsEmbedder.write_with_lyrics(str(segment_mp3), str(final_mp3), str(segment_lrc),
+                                                 config.tag_backend)
+        
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            list(pool.map(StageTimer.bind(cut), pending))
+    else:
+        # One ffmpeg run for all segments
+        AudioProcessor.extract_segments(str(audio_path),
+                                        [(s, e, str(mp3)) for s, e, _, mp3, _ in pending], enhance, config.seek)
+        for _, _, final_mp3, segment_mp3, segment_lrc in pending:
+            LyricsEmbedder.write_with_lyrics(str(segment_mp3), str(final_mp3), str(segment_lrc),
+                                             config.tag_backend)
+    
+    for _, _, final_mp3, segment_mp3, segment_lrc in pending:
+        if not config.no_cleanup:
+            segment_mp3.unlink(missing_ok=True)
+            segment_lrc.unlink(missing_ok=True)
+        print(f"✅ Completed: {final_mp3}")
+    
+    return outputs
+
 def merge_mode(config: Config):
     """Merge mode"""
     if not config.audio_path or not config.subtitle_path:
@@ -269,77 +1874,429 @@ def merge_mode(config: Config):
     source_mp3 = config.source_dir / f"{base_name}.mp3"
     source_lrc = config.source_dir / f"{base_name}.lrc"
     
+    if config.segments:
+        segments = [(s, e, f"{base_name} ({segment_label(s, e)})") for s, e in config.segments]
+        outputs = process_segments(config, audio_path, subtitle_path, base_name, segments,
+                                   config.enhance_stereo)
+        print(f"✅ Merge completed: {len(outputs)} segments")
+        return
+    
+    # Convert subtitles first so the lyrics can be written together with the audio
+    SubtitleProcessor.srt_to_lrc(str(subtitle_path), str(source_lrc), 
+                                config.start_time, config.end_time)
+    
     # Check if input audio is already in source_dir and is the same as target
     if audio_path.resolve() == source_mp3.resolve():
         print(f"✅ Audio file already in source directory: {audio_path}")
         # Apply stereo enhancement if requested
         if config.enhance_stereo:
             AudioProcessor.enhance_stereo(str(source_mp3))
-    else:
-        # Convert audio
+        LyricsEmbedder.write_with_lyrics(str(source_mp3), str(output_mp3), str(source_lrc),
+                                         config.tag_backend)
+    elif config.no_cleanup:
+        # Keep the converted audio as an intermediate file
         AudioProcessor.convert_to_mp3(str(audio_path), str(source_mp3), config.enhance_stereo,
-                                     config.start_time, config.end_time)
-    
-    # Convert subtitles
-    SubtitleProcessor.srt_to_lrc(str(subtitle_path), str(source_lrc), 
-                                config.start_time, config.end_time)
-    
-    # Embed lyrics
-    shutil.copy2(source_mp3, output_mp3)
-    LyricsEmbedder.embed_lyrics(str(output_mp3), str(source_lrc))
+                                     config.start_time, config.end_time, config.seek)
+        LyricsEmbedder.write_with_lyrics(str(source_mp3), str(output_mp3), str(source_lrc),
+                                         config.tag_backend)
+    elif config.tag_backend != "builtin":
+        # Convert into the output directory, then tag it in place
+        AudioProcessor.convert_to_mp3(str(audio_path), str(output_mp3), config.enhance_stereo,
+                                     config.start_time, config.end_time, config.seek)
+        LyricsEmbedder.embed_lyrics(str(output_mp3), str(source_lrc), config.tag_backend)
+    else:
+        # Convert audio and embed lyrics in one write of the final file
+        AudioProcessor.convert_to_mp3(str(audio_path), str(output_mp3), config.enhance_stereo,
+                                     config.start_time, config.end_time, config.seek,
+                                     lrc_path=str(source_lrc))
     
     # Cleanup
     if not config.no_cleanup:
-        source_mp3.unlink(missing_ok=True)
-        source_lrc.unlink(missing_ok=True)
+        with StageTimer.measure("cleanup"):
+            source_mp3.unlink(missing_ok=True)
+            source_lrc.unlink(missing_ok=True)
     
     print(f"✅ Merge completed: {output_mp3}")
 
-def download_mode(config: Config):
+def make_downloader(config: Config):
+    """Downloader for the configured engine, with the probe cache when enabled"""
+    downloader = get_downloader(config.engine)
+    if config.probe_ttl > 0:
+        downloader = CachedDownloader(downloader, ProbeCache(config.source_dir / "probe_cache.sqlite",
+                                                             config.probe_ttl))
+    return downloader
+
+class DownloadJob:
+    """One download mode job, split into network, CPU and I/O bound stages"""
+    
+    STAGES = ["probe", "download", "encode", "embed"]
+    
+    def __init__(self, config: Config, journal: Optional[BatchJournal] = None):
+        if not config.url:
+            sys.exit("❌ YouTube URL required")
+        
+        self.config = config
+        self.journal = journal
+        self.started = time.monotonic()
+        self.manifest = OutputManifest(config.output_dir / "manifest.sqlite")
+        self.options = OutputManifest.job_options(config)
+        
+        # State from an interrupted batch run
+        self.journal_key = BatchJournal.item_key(config.url, self.options) if journal else ""
+        self.resumed = journal.resume(self.journal_key) if journal else {}
+        
+        self.downloader = None
+        self.segments: Optional[List[Tuple[Optional[str], Optional[str], str]]] = None
+        self.cut_from: Optional[Dict[str, Path]] = None
+        self.raw: Optional[Path] = None
+        self.output = None  # Set once the job has nothing left to do
+    
+    def stage(self, name: str, **data):
+        if self.journal:
+            self.journal.stage(self.journal_key, name, **data)
+    
+    def get_downloader(self):
+        if self.downloader is None:
+            self.downloader = make_downloader(self.config)
+        return self.downloader
+    
+    def record(self, outputs: List[Tuple[Path, Optional[str], Optional[str]]], adopted: bool = False):
+        # Adopted outputs were made before the manifest existed, so they have no processing time
+        self.manifest.record(self.video_id, self.title, self.options,
+                             [(path, OutputManifest.seconds(s), OutputManifest.seconds(e))
+                              for path, s, e in outputs],
+                             None if adopted else time.monotonic() - self.started)
+    
+    def finish(self, outputs: List[Tuple[Path, Optional[str], Optional[str]]], adopted: bool = False):
+        self.record(outputs, adopted)
+        self.output = [path for path, _, _ in outputs] if self.segments else outputs[0][0]
+    
+    def probe(self):
+        """Network: skip checks, video information and output planning"""
+        config, resumed = self.config, self.resumed
+        
+        # Skip finished jobs before touching the network
+        known_id = YouTubeDownloader.parse_video_id(config.url) or resumed.get("id")
+        if known_id:
+            done = self.manifest.completed(known_id, self.options)
+            if done:
+                print(f"✅ Already completed: {done[0] if len(done) == 1 else f'{len(done)} files'}")
+                self.output = done if len(done) > 1 or config.segments else done[0]
+                return
+        
+        # Get video information
+        if "title" in resumed:
+            print(f"↩️ Resuming after stage '{resumed['stage']}': {resumed['title']}")
+            metadata = resumed
+        else:
+            with StageTimer.measure("probe"):
+                metadata = self.get_downloader().get_metadata(config.url)
+        self.video_id = video_id = metadata['id']
+        self.title = title = metadata['title']
+        
+        # File paths (a time range is part of the name, so ranges never overwrite each other)
+        name = f"{title} [{video_id}]"
+        if config.start_time or config.end_time:
+            name += f" ({segment_label(config.start_time, config.end_time)})"
+        self.final_mp3 = config.output_dir / f"{name}.mp3"
+        
+        # Segments to cut locally from one full-length download
+        chapters = None
+        if config.split_chapters:
+            # Fetched with the metadata (or recorded in the journal), so the page is probed once
+            chapters = metadata.get("chapters")
+            if chapters:
+                self.segments = [(SubtitleProcessor.format_time(c["start"]), SubtitleProcessor.format_time(c["end"]),
+                                  f"{title} [{video_id}] - {i:02d} {c['title']}")
+                                 for i, c in enumerate(chapters, 1)]
+                print(f"📑 Splitting into {len(chapters)} chapters")
+            else:
+                print("⚠️ No chapters found, producing a single file")
+        elif config.segments:
+            self.segments = [(s, e, f"{title} [{video_id}] ({segment_label(s, e)})") for s, e in config.segments]
+        
+        # Outputs are written to .part files and renamed; drop leftovers from a crash
+        if self.segments:
+            planned = [(config.output_dir / f"{name}.mp3", s, e) for s, e, name in self.segments]
+            self.start_time = self.end_time = None
+        else:
+            planned = [(self.final_mp3, config.start_time, config.end_time)]
+            self.start_time, self.end_time = config.start_time, config.end_time
+        if resumed:
+            for path, _, _ in planned:
+                Path(f"{path}.part").unlink(missing_ok=True)
+        
+        existing = [path for path, _, _ in planned if path.exists()]
+        if existing:
+            done = self.manifest.completed(video_id, self.options)
+            if done and set(done) == {path for path, _, _ in planned}:
+                print(f"✅ Already completed: {done[0] if len(done) == 1 else f'{len(done)} files'}")
+                self.output = done if self.segments else done[0]
+                return
+            # Only a file recorded for other options is a name collision; unrecorded files come
+            # from older versions of the tool or an interrupted run and count as done
+            key = OutputManifest.job_key(self.options)
+            foreign = [path for path, owner in self.manifest.owners(existing).items() if owner != key]
+            if foreign:
+                sys.exit(f"❌ Output already exists and is recorded for other options: {foreign[0]}")
+            if len(existing) == len(planned):
+                print(f"✅ File already exists: {existing[0] if len(existing) == 1 else f'{len(existing)} files'}")
+                self.finish(planned, adopted=True)
+                return
+        
+        if "title" not in resumed:
+            probed = {"id": video_id, "title": title}
+            if config.split_chapters:
+                probed["chapters"] = chapters or []
+            self.stage("probed", **probed)
+        
+        # Source files are cached per video, range, language and processing options
+        self.cache = SourceCache(config.source_dir)
+        self.entry = self.cache.entry(video_id, self.start_time, self.end_time, config.lang,
+                                      config.enhance_stereo)
+    
+    def download(self):
+        """Network: fetch the source audio and subtitles unless a cached copy can be used"""
+        config, cache, entry = self.config, self.cache, self.entry
+        start_time, end_time = self.start_time, self.end_time
+        
+        # Only the stream is fetched here; transcoding happens in the encode stage
+        full_entry = cache.entry(self.video_id, None, None, config.lang, config.enhance_stereo)
+        if cache.is_valid(entry, ("mp3", "srt")):
+            print(f"✅ Using cached source files: {entry['stem']}")
+            self.stage("downloaded", stem=entry["stem"])
+        elif (start_time or end_time) and cache.is_valid(full_entry, ("mp3", "srt")):
+            # The range is cut from the cached full-length source in the encode stage
+            self.cut_from = full_entry
+        elif self.resumed.get("raw") and Path(self.resumed["raw"]).exists() and entry["srt"].exists():
+            # yt-dlp renames files into place once complete, so a journaled stream is whole
+            self.raw = Path(self.resumed["raw"])
+            print(f"✅ Using downloaded stream: {self.raw.name}")
+        else:
+            cache.remove(entry)
+            with StageTimer.measure("download"):
+                self.raw = self.get_downloader().download(config.url, config.source_dir, entry["stem"], 
+                                                          config.lang, start_time, end_time)
+            if not self.raw:
+                sys.exit("❌ Download failed")
+            self.stage("fetched", raw=str(self.raw))
+    
+    def encode(self):
+        """CPU: transcoding, local cuts and per-segment encodes"""
+        config, cache, entry = self.config, self.cache, self.entry
+        
+        source, enhance = entry["mp3"], False
+        if self.raw and self.segments and not config.split_chapters:
+            # Segments are encoded straight from the downloaded stream by one ffmpeg run,
+            # without a full-length encode (and a second lossy generation) in between
+            source, enhance = self.raw, config.enhance_stereo
+        elif self.raw:
+            # Transcode and enhance the downloaded stream in one ffmpeg graph
+            AudioProcessor.convert_to_mp3(str(self.raw), str(entry["mp3"]), config.enhance_stereo)
+            cache.commit(entry, ("mp3", "srt"))
+            self.raw.unlink(missing_ok=True)
+            self.stage("downloaded", stem=entry["stem"])
+        elif self.cut_from:
+            # Cut the range from the cached full-length source instead of fetching it again
+            print(f"✅ Cutting range from cached full download: {self.cut_from['stem']}")
+            cache.remove(entry)
+            AudioProcessor.convert_to_mp3(str(self.cut_from["mp3"]), str(entry["mp3"]), False,
+                                         self.start_time, self.end_time, config.seek)
+            with StageTimer.measure("copy"):
+                shutil.copy2(self.cut_from["srt"], entry["srt"])
+            cache.commit(entry, ("mp3", "srt"))
+            self.stage("downloaded", stem=entry["stem"])
+        
+        if self.segments:
+            outputs = process_segments(config, source, entry["srt"], entry["stem"], self.segments,
+                                       enhance=enhance, parallel=config.split_chapters)
+            if self.raw:
+                self.raw.unlink(missing_ok=True)
+            self.stage("embedded")
+            if not config.no_cleanup:
+                cache.remove(entry)
+            self.finish([(f, s, e) for f, (s, e, _) in zip(outputs, self.segments)])
+    
+    def embed(self):
+        """I/O: lyrics conversion, tagging and cleanup"""
+        config, cache, entry = self.config, self.cache, self.entry
+        
+        # Convert subtitles
+        if not cache.is_valid(entry, ("lrc",)):
+            SubtitleProcessor.srt_to_lrc(str(entry["srt"]), str(entry["lrc"]), self.start_time, self.end_time)
+            cache.commit(entry, ("lrc",))
+        self.stage("converted")
+        
+        # Embed lyrics
+        LyricsEmbedder.write_with_lyrics(str(entry["mp3"]), str(self.final_mp3), str(entry["lrc"]),
+                                         config.tag_backend)
+        self.stage("embedded")
+        
+        # Cleanup
+        if not config.no_cleanup:
+            cache.remove(entry)
+        
+        self.finish([(self.final_mp3, self.start_time, self.end_time)])
+        print(f"✅ Completed: {self.final_mp3}")
+    
+    def run(self):
+        """Run the remaining stages in order"""
+        for name in self.STAGES:
+            if self.output is not None:
+                break
+            getattr(self, name)()
+        return self.output
+
+class StagePipeline:
+    """Worker pools per stage, linked by bounded queues so a slow stage holds back its producers"""
+    
+    def __init__(self, stages: List[Tuple[int, Callable]], queue_size: int = 2):
+        self.stages = stages
+        self.queues = [queue.Queue() if i == 0 else queue.Queue(maxsize=max(1, workers * queue_size))
+                       for i, (workers, _) in enumerate(stages)]
+        self.stopped = threading.Event()
+    
+    def worker(self, index: int):
+        _, func = self.stages[index]
+        inbox = self.queues[index]
+        outbox = self.queues[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            item = inbox.get()
+            if item is None:
+                return
+            if self.stopped.is_set():
+                continue
+            # A stage returns the item to pass on, or None once it is finished
+            item = func(item)
+            if item is not None and outbox is not None:
+                outbox.put(item)
+    
+    def run(self, items: Iterable):
+        """Feed items through every stage and wait for the last one to drain"""
+        for item in items:
+            self.queues[0].put(item)
+        
+        pools = []
+        for index, (workers, _) in enumerate(self.stages):
+            threads = [threading.Thread(target=self.worker, args=(index,), daemon=True)
+                       for _ in range(workers)]
+            for t in threads:
+                t.start()
+            pools.append(threads)
+        
+        try:
+            # Each stage is told to stop once everything upstream of it has finished
+            for index, threads in enumerate(pools):
+                for _ in threads:
+                    self.queues[index].put(None)
+                for t in threads:
+                    t.join()
+        except KeyboardInterrupt:
+            # Running stages stop with their subprocesses; queued items are dropped
+            self.stopped.set()
+            raise
+
+def download_mode(config: Config, journal: Optional[BatchJournal] = None):
     """Download mode"""
-    if not config.url:
-        sys.exit("❌ YouTube URL required")
-    
-    # Get video information
-    metadata = YouTubeDownloader.get_metadata(config.url)
-    video_id = metadata['id']
-    title = metadata['title']
-    
-    # File paths
-    final_mp3 = config.output_dir / f"{title} [{video_id}].mp3"
-    source_mp3 = config.source_dir / f"{video_id}.mp3"
-    source_srt = config.source_dir / f"{video_id}.{config.lang}.srt"
-    source_lrc = config.source_dir / f"{video_id}.lrc"
-    
-    if final_mp3.exists():
-        print(f"✅ File already exists: {final_mp3}")
-        return
+    return DownloadJob(config, journal).run()
+
+def read_batch_urls(batch_path: str) -> List[str]:
+    """Read URLs from a batch file ('-' for stdin)"""
+    if batch_path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(batch_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
     
-    # Download
-    if not (source_mp3.exists() and source_srt.exists()):
-        if not YouTubeDownloader.download(config.url, config.source_dir, video_id, 
-                                        config.lang, config.start_time, config.end_time):
-            sys.exit("❌ Download failed")
+    # Skip blanks and comments, drop duplicates (by video id when known) while keeping order
+    urls = {}
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith('#'):
+            urls.setdefault(YouTubeDownloader.parse_video_id(url) or url, url)
+    return list(urls.values())
+
+def batch_mode(config: Config):
+    """Batch mode"""
+    urls = read_batch_urls(config.batch)
+    if not urls:
+        sys.exit("❌ No URLs found in batch input")
+    
+    # Stages reached by each item are journaled so an interrupted batch resumes where it stopped
+    journal = BatchJournal(config.source_dir / "batch_journal.jsonl")
+    print(f"📋 Processing {len(urls)} URLs with {config.jobs} workers")
     
-    # Stereo enhancement
-    if config.enhance_stereo and source_mp3.exists():
-        AudioProcessor.enhance_stereo(str(source_mp3))
+    def stage(names: List[str]) -> Callable:
+        def run(item: Dict[str, object]) -> Optional[Dict[str, object]]:
+            url, job = item["url"], item["job"]
+            item.setdefault("started", time.monotonic())
+            try:
+                if job is None:
+                    item_config = copy.copy(config)
+                    item_config.url = url
+                    item["job"] = job = DownloadJob(item_config, journal)
+                for name in names:
+                    if job.output is None:
+                        getattr(job, name)()
+                if job.output is None:
+                    return item
+                outputs = job.output if isinstance(job.output, list) else [job.output]
+                journal.stage(job.journal_key, "done", outputs=[str(p) for p in outputs])
+                item.update(ok=True, output=job.output)
+            except (Exception, SystemExit) as e:
+                # Fatal errors exit; keep the rest of the batch going
+                error = re.sub(r'^❌\s*', '', str(e))
+                if job is not None:
+                    journal.stage(job.journal_key, "failed", error=error)
+                item.update(ok=False, error=error)
+            item["elapsed"] = time.monotonic() - item["started"]
+            return None
+        return run
     
-    # Convert subtitles
-    if not source_lrc.exists():
-        SubtitleProcessor.srt_to_lrc(str(source_srt), str(source_lrc), 
-                                   config.start_time, config.end_time)
+    # Downloads, encodes and tagging run in separate pools so network and CPU work overlap
+    results = [{"url": url, "job": None} for url in urls]
+    pipeline = StagePipeline([(config.jobs, stage(["probe", "download"])),
+                              (os.cpu_count() or 1, stage(["encode"])),
+                              (2, stage(["embed"]))])
+    try:
+        pipeline.run(results)
+    except KeyboardInterrupt:
+        print(f"\n⚠️ Batch interrupted; rerun the same command to resume ({journal.path})")
+        raise
+    journal.compact()
     
-    # Embed lyrics
-    shutil.copy2(source_mp3, final_mp3)
-    LyricsEmbedder.embed_lyrics(str(final_mp3), str(source_lrc))
+    # Summary
+    failed = [r for r in results if not r["ok"]]
+    print(f"\n📊 Batch summary: {len(results) - len(failed)} succeeded, {len(failed)} failed")
+    for r in results:
+        if r["ok"]:
+            output = f"{len(r['output'])} files" if isinstance(r["output"], list) else r["output"]
+            print(f"  ✅ {r['url']} -> {output} ({r['elapsed']:.1f}s)")
+        else:
+            print(f"  ❌ {r['url']}: {r['error']} ({r['elapsed']:.1f}s)")
     
-    # Cleanup
-    if not config.no_cleanup:
-        for f in [source_mp3, source_srt, source_lrc]:
-            f.unlink(missing_ok=True)
+    if failed:
+        sys.exit(1)
+
+def library_mode(config: Config):
+    """List outputs recorded in the output manifest"""
+    video_id = None
+    if config.library:
+        video_id = YouTubeDownloader.parse_video_id(config.library)
+        if not video_id:
+            sys.exit(f"❌ Cannot read a video id from: {config.library}")
     
-    print(f"✅ Completed: {final_mp3}")
+    entries = OutputManifest(config.output_dir / "manifest.sqlite").entries(video_id)
+    for e in entries:
+        span = ""
+        if e["start_time"] is not None or e["end_time"] is not None:
+            start = SubtitleProcessor.format_time(e["start_time"] or 0)
+            end = SubtitleProcessor.format_time(e["end_time"]) if e["end_time"] is not None else ""
+            span = f" ({start}-{end})"
+        size = f"{e['size'] / 1e6:.1f} MB" if e["size"] is not None else "?"
+        print(f"🎵 [{e['video_id']}] {e['title'] or Path(e['path']).stem}{span} - {size} - {e['path']}")
+    print(f"📚 {len(entries)} recorded outputs")
+    return entries
 
 def main():
     parser = argparse.ArgumentParser(description="YouTube audio download and lyrics embedding tool")
@@ -348,6 +2305,9 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("url", nargs='?', help="YouTube video URL")
     group.add_argument("--merge", action="store_true", help="Merge mode")
+    group.add_argument("--batch", metavar="FILE", help="Batch mode: file with one URL per line ('-' for stdin)")
+    group.add_argument("--library", nargs='?', const='', metavar="URL",
+                       help="List outputs recorded in the output directory (optionally for one video)")
     
     # Merge mode parameters
     parser.add_argument("--audio", help="Audio file path")
@@ -357,17 +2317,41 @@ def main():
     parser.add_argument("-o", "--output", help="Output directory (default: ./final_mp3s)")
     parser.add_argument("-s", "--start", help="Start time (MM:SS or HH:MM:SS)")
     parser.add_argument("-e", "--end", help="End time (MM:SS or HH:MM:SS)")
+    parser.add_argument("--segments", help="Comma-separated START-END segments to extract (e.g. 1:00-2:30,5:00-6:00)")
+    parser.add_argument("--segments-file", help="File with one START-END segment per line")
+    parser.add_argument("--split-chapters", action="store_true", help="Save one MP3 per video chapter")
     parser.add_argument("-l", "--lang", default="en", help="Subtitle language (default: en)")
     parser.add_argument("--source-dir", default="./source_files", help="Source files directory")
     parser.add_argument("--no-cleanup", action="store_true", help="Keep intermediate files")
     parser.add_argument("--enhance-stereo", action="store_true", help="Stereo enhancement")
+    parser.add_argument("--engine", choices=["auto", "api", "cli"], default="auto",
+                        help="yt-dlp engine: in-process API or CLI subprocesses (default: auto)")
+    parser.add_argument("--seek", choices=AudioProcessor.SEEK_STRATEGIES, default="auto",
+                        help="ffmpeg seek strategy when trimming (default: auto = input)")
+    parser.add_argument("--tag-backend", choices=list(TAG_BACKENDS), default="builtin",
+                        help="Library used to write the lyrics tag (default: builtin)")
+    parser.add_argument("--probe-ttl", type=float, default=168,
+                        help="Hours to reuse cached video metadata and subtitle lists (0 disables, default: 168)")
+    parser.add_argument("--progress", action="store_true",
+                        help="Print ffmpeg progress (position, speed, bitrate, ETA) while encoding")
+    parser.add_argument("--report", metavar="FILE",
+                        help="Write per-stage wall time, child CPU time and I/O as JSON to FILE")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Parallel workers in batch mode (default: 1)")
     
     args = parser.parse_args()
     config = Config(args)
+    if args.progress:
+        AudioProcessor.progress_callback = FfmpegProgress.print_report
+    if args.report:
+        StageTimer.active = StageTimer()
     
     try:
         if config.merge_mode:
             merge_mode(config)
+        elif config.batch:
+            batch_mode(config)
+        elif config.library is not None:
+            library_mode(config)
         else:
             download_mode(config)
     except KeyboardInterrupt:
@@ -376,6 +2360,9 @@ def main():
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
+    finally:
+        if StageTimer.active:
+            StageTimer.active.write(args.report)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file